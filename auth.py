@@ -1,52 +1,162 @@
-from passlib.context import CryptContext
-from jose import JWTError, jwt
-from datetime import datetime, timedelta
-from typing import Optional
-import os
-import warnings
-from dotenv import load_dotenv
-
-# Suppress bcrypt version warning
-warnings.filterwarnings("ignore", message=".*error reading bcrypt version.*")
-
-load_dotenv()
-
-# Security settings
-SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
-
-# Password hashing
-pwd_context = CryptContext(
-    schemes=["bcrypt"], 
-    deprecated="auto",
-    bcrypt__rounds=12,
-    bcrypt__ident="2b"
-)
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a plain password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password: str) -> str:
-    """Generate password hash."""
-    return pwd_context.hash(password)
-
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
-    """Create JWT access token."""
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
-
-def verify_token(token: str) -> Optional[dict]:
-    """Verify JWT token."""
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except JWTError:
-        return None
+import bcrypt
+import jwt
+from datetime import timedelta
+from typing import Any, Dict, Hashable, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import hashlib
+import hmac
+import os
+import threading
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Security settings
+SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
+ALGORITHM = "HS256"
+_SECRET_KEY_BYTES = SECRET_KEY.encode()
+_ALGORITHMS = (ALGORITHM,)
+ACCESS_TOKEN_EXPIRE_MINUTES = 30
+
+# Verified token cache limits
+TOKEN_CACHE_MAX_SIZE = 10_000
+TOKEN_CACHE_MAX_TTL = 300  # seconds
+
+# Password verification cache limits
+PASSWORD_CACHE_MAX_SIZE = 1024
+PASSWORD_CACHE_TTL = 30  # seconds
+
+
+class TTLCache:
+    """Small thread-safe LRU cache with a per-entry expiry time."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, now: Optional[float] = None) -> Any:
+        """Return the cached value for key, or None if missing or expired."""
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, expires_at: float) -> None:
+        """Store value under key until the absolute time expires_at."""
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """Remove key if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_token_cache = TTLCache(TOKEN_CACHE_MAX_SIZE)
+_password_cache = TTLCache(PASSWORD_CACHE_MAX_SIZE)
+_password_cache_key = _SECRET_KEY_BYTES
+
+# Password hashing
+BCRYPT_ROUNDS = 12
+BCRYPT_MAX_PASSWORD_BYTES = 72  # bcrypt ignores anything past 72 bytes
+
+# bcrypt releases the GIL, so a dedicated pool lets concurrent hashes use every core
+# without blocking the event loop or starving the default executor.
+_bcrypt_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="bcrypt")
+
+def _password_bytes(password: str) -> bytes:
+    return password.encode("utf-8")[:BCRYPT_MAX_PASSWORD_BYTES]
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a plain password against its hash.
+
+    Results are cached briefly under an HMAC of the (password, hash) pair so
+    repeated logins skip the bcrypt key schedule; the plain password is
+    never stored.
+    """
+    key = hmac.new(
+        _password_cache_key,
+        plain_password.encode() + b"\x00" + hashed_password.encode(),
+        hashlib.sha256,
+    ).digest()
+    now = time.time()
+    cached = _password_cache.get(key, now)
+    if cached is not None:
+        return cached
+    try:
+        result = bcrypt.checkpw(_password_bytes(plain_password), hashed_password.encode("utf-8"))
+    except ValueError:
+        # Malformed or non-bcrypt hash
+        result = False
+    _password_cache.set(key, result, now + PASSWORD_CACHE_TTL)
+    return result
+
+def get_password_hash(password: str) -> str:
+    """Generate password hash."""
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS, prefix=b"2b")
+    return bcrypt.hashpw(_password_bytes(password), salt).decode("utf-8")
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the bcrypt thread pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_bcrypt_pool, verify_password, plain_password, hashed_password)
+
+async def aget_password_hash(password: str) -> str:
+    """Hash a password on the bcrypt thread pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_bcrypt_pool, get_password_hash, password)
+
+def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
+    """Create JWT access token."""
+    to_encode = data.copy()
+    expires_in = int((expires_delta or timedelta(minutes=15)).total_seconds())
+    to_encode["exp"] = int(time.time()) + expires_in
+    encoded_jwt = jwt.encode(to_encode, _SECRET_KEY_BYTES, algorithm=ALGORITHM)
+    return encoded_jwt
+
+def clear_token_cache() -> None:
+    """Drop all cached token payloads."""
+    _token_cache.clear()
+
+def verify_token(token: str) -> Optional[Dict[str, Any]]:
+    """Verify JWT token.
+
+    Successfully decoded payloads are cached until their ``exp`` claim so the
+    signature check runs once per token; failures are never cached.
+    """
+    now = time.time()
+    payload = _token_cache.get(token, now)
+    if payload is not None:
+        return dict(payload)
+    try:
+        payload = jwt.decode(token, _SECRET_KEY_BYTES, algorithms=_ALGORITHMS)
+    except jwt.InvalidTokenError:
+        return None
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        expires_at = min(float(exp), now + TOKEN_CACHE_MAX_TTL)
+        if expires_at > now:
+            _token_cache.set(token, payload, expires_at)
+    return dict(payload)
@@ -2,6 +2,8 @@
 Production configuration for Garments ERP API
 """
 import os
+import textwrap
+from functools import lru_cache
 from typing import Optional
 
 class Settings:
@@ -21,7 +23,7 @@ class Settings:
     # API Configuration
     API_TITLE: str = "Garments ERP API"
     API_VERSION: str = "1.0.0"
-    API_DESCRIPTION: str = """
+    API_DESCRIPTION: str = textwrap.dedent("""
     Complete Garments ERP System with Sales Bills, Purchase Management, 
     Financial Transactions, and Comprehensive Business Logic.
     
@@ -30,14 +32,14 @@ class Settings:
     - **Bill Book Management**: Multiple bill books with different tax types
     - **Financial Transactions**: Automatic ledger updates and accounting
     - **Advanced Search**: Powerful filtering and search capabilities
-    """
+    """).strip()
     
     # CORS
-    CORS_ORIGINS: list = [
+    CORS_ORIGINS: tuple = (
         "http://localhost:3000",
         "http://localhost:8080", 
-        "https://your-frontend-domain.com"
-    ]
+        "https://your-frontend-domain.com",
+    )
     
     # Rate Limiting
     RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "False").lower() == "true"
@@ -67,5 +69,11 @@ class Settings:
     def is_development(self) -> bool:
         return self.ENVIRONMENT.lower() == "development"
 
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """Return the process-wide Settings instance (env is parsed once)."""
+    return Settings()
+
+
 # Global settings instance
-settings = Settings()
+settings = get_settings()
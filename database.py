@@ -10,14 +10,36 @@ DATABASE_URL = os.getenv('DATABASE_URL')
 if DATABASE_URL is None:
     raise ValueError("DATABASE_URL environment variable is not set")
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Connection pool sizing; each request holds one connection for its session
+POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '20'))
+MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '40'))
+POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', '10'))  # seconds
+POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))  # seconds
+
+pool_options = {}
+if not DATABASE_URL.startswith('sqlite'):
+    pool_options = dict(
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT,
+        pool_recycle=POOL_RECYCLE,
+    )
+
+# Room in the compiled-statement cache for every endpoint's query shapes;
+# pre_ping replaces connections the server or a proxy dropped while idle
+engine = create_engine(DATABASE_URL, query_cache_size=1200, pool_pre_ping=True, **pool_options)
+# Keep loaded attributes after commit so handlers can serialize what they just
+# wrote without a re-SELECT per instance; call refresh() when DB-side values matter.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 Base = declarative_base()
 
 
 def get_db():
-    db = SessionLocal()
-    try:
+    """Database dependency.
+
+    Shared by every route and auth dependency so FastAPI's per-request
+    dependency cache hands them all the same Session. The session only
+    checks out a connection on first use.
+    """
+    with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
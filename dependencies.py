@@ -1,73 +1,138 @@
-from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer
-from sqlalchemy.orm import Session
-from database import SessionLocal
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, NamedTuple, Optional
+import time
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.orm import Session, load_only
+from database import get_db
 from models.user import User, UserRole, UserStatus
-from auth import verify_token
+from auth import verify_token, TTLCache
 from schemas.user import TokenData
 
 # Security schemes - Only JWT Bearer token
 security = HTTPBearer()
 
-def get_db():
-    """Database dependency."""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Authenticated user cache (username -> CachedUser). The cache is per process
+# and invalidate_user() only clears the calling worker, so other workers may
+# keep a deactivated or demoted user's old role/status for up to this TTL.
+USER_CACHE_MAX_SIZE = 5000
+USER_CACHE_TTL = 5  # seconds
+_user_cache = TTLCache(USER_CACHE_MAX_SIZE)
 
-def get_current_user(
-    credentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user using JWT token."""
-    credentials_exception = HTTPException(
+_BEARER_CHALLENGE = {"WWW-Authenticate": "Bearer"}
+
+
+class CachedUser(NamedTuple):
+    """Detached snapshot of the user columns needed by route handlers."""
+    id: int
+    username: str
+    role: UserRole
+    status: UserStatus
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+
+def invalidate_user(username: str) -> None:
+    """Drop a cached user from this worker; call after any change to that user.
+
+    Other workers pick up the change when their entry expires (USER_CACHE_TTL).
+    """
+    _user_cache.pop(username)
+
+
+def _get_user_by_username(db: Session, username: str) -> Optional[CachedUser]:
+    """Load a user snapshot, serving repeat lookups from the process cache.
+
+    Snapshots can be up to USER_CACHE_TTL seconds stale on workers other
+    than the one that changed the user.
+    """
+    now = time.time()
+    cached = _user_cache.get(username, now)
+    if cached is not None:
+        return cached
+
+    user = (
+        db.query(User)
+        .options(load_only(User.id, User.username, User.role, User.status, User.created_at, User.updated_at))
+        .filter(User.username == username)
+        .first()
+    )
+    if user is None:
+        return None
+
+    snapshot = CachedUser(
+        id=user.id,
+        username=user.username,
+        role=user.role,
+        status=user.status,
+        created_at=user.created_at,
+        updated_at=user.updated_at,
+    )
+    _user_cache.set(username, snapshot, now + USER_CACHE_TTL)
+    return snapshot
+
+def _credentials_exception() -> HTTPException:
+    """401 raised for missing, invalid or unknown-user tokens."""
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
+        headers=_BEARER_CHALLENGE,
     )
+
+def get_current_user(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> CachedUser:
+    """Get current authenticated user using JWT token.
+
+    The resolved user is kept on request.state for the rest of the request,
+    so resolving it again from another dependency graph is a dict lookup.
+    """
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
     
-    try:
-        payload = verify_token(credentials.credentials)
-        if payload is None:
-            raise credentials_exception
-        username = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-    except Exception:
-        raise credentials_exception
+    payload = verify_token(credentials.credentials)
+    username = payload.get("sub") if payload is not None else None
+    if username is None:
+        raise _credentials_exception()
     
-    # Get user from database
-    user = db.query(User).filter(User.username == username).first()
+    # Get user (cached snapshot or database)
+    user = _get_user_by_username(db, username)
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     
     # Check if user is active
-    if user.status.value != UserStatus.ACTIVE.value:
+    if user.status != UserStatus.ACTIVE:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User account is not active"
         )
     
+    request.state.user = user
     return user
 
-def get_current_active_user(current_user: User = Depends(get_current_user)):
+def get_current_active_user(current_user: CachedUser = Depends(get_current_user)) -> CachedUser:
     """Get current active user."""
-    if current_user.status.value != UserStatus.ACTIVE.value:
+    if current_user.status != UserStatus.ACTIVE:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, 
             detail="Inactive user"
         )
     return current_user
 
-def require_role(required_role: UserRole):
-    """Dependency to require specific user role."""
-    def role_checker(current_user: User = Depends(get_current_active_user)):
-        if current_user.role.value == UserRole.SUPERADMIN.value:
-            return current_user  # Superadmin can access everything
-        
-        if current_user.role.value != required_role.value:
+@lru_cache(maxsize=None)
+def require_role(required_role: UserRole) -> Callable[..., CachedUser]:
+    """Dependency to require specific user role.
+
+    Memoized so every guard for a role is the same callable, which lets
+    FastAPI's per-request dependency cache reuse it.
+    """
+    def role_checker(current_user: CachedUser = Depends(get_current_active_user)) -> CachedUser:
+        # Superadmin can access everything
+        if current_user.role not in (UserRole.SUPERADMIN, required_role):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Insufficient permissions"
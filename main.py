@@ -1,14 +1,18 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.orm import configure_mappers
 import os
+import textwrap
 
 from routes import router
+from responses import ORJSONResponse
 from seed import init_database
 
 # Import settings if available
 try:
-    from config.settings import settings
+    from config.settings import get_settings
+    settings = get_settings()
     TITLE = settings.API_TITLE
     VERSION = settings.API_VERSION
     DESCRIPTION = settings.API_DESCRIPTION
@@ -17,7 +21,7 @@ except ImportError:
     # Fallback to environment variables or defaults
     TITLE = os.getenv("API_TITLE", "Garments ERP API")
     VERSION = os.getenv("API_VERSION", "1.0.0")
-    DESCRIPTION = """
+    DESCRIPTION = textwrap.dedent("""
     Complete Garments ERP System with Sales Bills, Purchase Management, 
     Financial Transactions, and Comprehensive Business Logic.
     
@@ -26,17 +30,27 @@ except ImportError:
     - **Bill Book Management**: Multiple bill books with different tax types
     - **Financial Transactions**: Automatic ledger updates and accounting
     - **Advanced Search**: Powerful filtering and search capabilities
-    """
-    CORS_ORIGINS = ["*"]
+    """).strip()
+    CORS_ORIGINS = ("*",)
+
+# Table creation and seeding run once at startup; set INIT_DB=false on
+# workers that should boot without touching the schema
+INIT_DB = os.getenv("INIT_DB", "True").lower() == "true"
+
+# CORS allow-lists, built once so origin checks are set lookups
+CORS_ALLOW_ORIGINS = frozenset(CORS_ORIGINS)
+CORS_ALLOW_METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS")
+CORS_ALLOW_HEADERS = ("authorization", "content-type")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup and shutdown logic"""
-    try:
-        init_database()
-        print("Database initialized successfully")
-    except Exception as e:
-        print(f"Warning: Database initialization failed: {e}")
+    if INIT_DB:
+        try:
+            init_database()
+            print("Database initialized successfully")
+        except Exception as e:
+            print(f"Warning: Database initialization failed: {e}")
     yield
     print("Shutting down...")
 
@@ -44,15 +58,16 @@ app = FastAPI(
     title=TITLE, 
     version=VERSION, 
     lifespan=lifespan,
-    description=DESCRIPTION
+    description=DESCRIPTION,
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=CORS_ORIGINS,  # Use configured origins
+    allow_origins=CORS_ALLOW_ORIGINS,  # Use configured origins
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=CORS_ALLOW_METHODS,
+    allow_headers=CORS_ALLOW_HEADERS,
 )
 
 
@@ -73,20 +88,19 @@ def read_root():
         ]
     }
 
-@app.get("/health")
+@app.get("/health", include_in_schema=False)
 def health_check():
     """Health check endpoint for monitoring"""
     return {"status": "healthy", "service": "garments-erp-api"}
 
 
-@app.get("/health")
-def health_check():
-    return {"status": "healthy", "message": "API is operational"}
-
-
 # Register routes
 app.include_router(router, prefix="/api")
 
+# All models are imported by now; configure mappers once up front instead of
+# on the first query
+configure_mappers()
+
 
 if __name__ == "__main__":
     import uvicorn
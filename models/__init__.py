@@ -1,27 +1,52 @@
-from .user import User, UserRole, UserStatus, Base
-from .company import CompanyDetails
-from .state import State
-from .accounts import AccountsMaster, Account
-from .agents import Agent
-from .customers import Customer, CustomerType
-from .suppliers import Supplier, SupplierType
-from .vendors import VendorMaster, VendorStatus
-from .employee_category import EmployeeCategory, SalaryStructure
-from .employees import Employee, EmployeeStatus
-from .category_master import CategoryMaster
-from .size_master import SizeMaster
-from .unit_master import UnitMaster
-from .raw_material_master import RawMaterialMaster
-from .stock_ledger import StockLedger
-from .purchase_order import PurchaseOrder, PurchaseOrderItem
-from .purchase import Purchase, PurchaseItem, PurchaseStatus, PurchaseType
-from .purchase_return import PurchaseReturn, PurchaseReturnItem, PurchaseReturnApproval, PurchaseReturnStatus, ReturnReason
-from .ledger_transaction import LedgerTransaction, TransactionBatch, TransactionTemplate
-from .product_management import (
-    ProductSize, ProductSleeveType, ProductDesign, Product, 
-    ProductVariant, ProductStockLedger, StockMovementType, DesignCategory
-)
-from .sales import Sale, SaleItem, SalePayment, SaleStatus, PaymentStatus, SaleType, PaymentMethod
+import importlib
+
+# Model modules are imported on first attribute access (PEP 562) so that
+# importing one model does not pull in and map every other model module.
+_LAZY_IMPORTS = {
+    "User": "user", "UserRole": "user", "UserStatus": "user", "Base": "user",
+    "CompanyDetails": "company",
+    "State": "state",
+    "AccountsMaster": "accounts", "Account": "accounts",
+    "Agent": "agents",
+    "Customer": "customers", "CustomerType": "customers",
+    "Supplier": "suppliers", "SupplierType": "suppliers",
+    "VendorMaster": "vendors", "VendorStatus": "vendors",
+    "EmployeeCategory": "employee_category", "SalaryStructure": "employee_category",
+    "Employee": "employees", "EmployeeStatus": "employees",
+    "CategoryMaster": "category_master",
+    "SizeMaster": "size_master",
+    "UnitMaster": "unit_master",
+    "RawMaterialMaster": "raw_material_master",
+    "StockLedger": "stock_ledger",
+    "PurchaseOrder": "purchase_order", "PurchaseOrderItem": "purchase_order",
+    "Purchase": "purchase", "PurchaseItem": "purchase",
+    "PurchaseStatus": "purchase", "PurchaseType": "purchase",
+    "PurchaseReturn": "purchase_return", "PurchaseReturnItem": "purchase_return",
+    "PurchaseReturnApproval": "purchase_return", "PurchaseReturnStatus": "purchase_return",
+    "ReturnReason": "purchase_return",
+    "LedgerTransaction": "ledger_transaction", "TransactionBatch": "ledger_transaction",
+    "TransactionTemplate": "ledger_transaction",
+    "ProductSize": "product_management", "ProductSleeveType": "product_management",
+    "ProductDesign": "product_management", "Product": "product_management",
+    "ProductVariant": "product_management", "ProductStockLedger": "product_management",
+    "StockMovementType": "product_management", "DesignCategory": "product_management",
+    "Sale": "sales", "SaleItem": "sales", "SalePayment": "sales", "SaleStatus": "sales",
+    "PaymentStatus": "sales", "SaleType": "sales", "PaymentMethod": "sales",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
 
 __all__ = [
     "User", "UserRole", "UserStatus", "Base", "CompanyDetails", "State", 
@@ -1,28 +1,41 @@
-from sqlalchemy import Column, Integer, String, Boolean, DECIMAL, DateTime, func
+from sqlalchemy import Column, Integer, String, Boolean, DECIMAL, Index
 from sqlalchemy.orm import relationship
 from models.user import Base
+from models.columns import scaled_int_property
+from models.mixins import TimestampMixin
 
 
-class AccountsMaster(Base):
+class AccountsMaster(TimestampMixin, Base):
     __tablename__ = "accounts_master"
 
     account_code = Column(String(20), primary_key=True, index=True)  # Primary key should be account_code
     account_name = Column(String(100), nullable=False)
     account_type = Column(String(50), nullable=False)  # Asset, Liability, Equity, Income, Expense
-    parent_account_code = Column(String(20), nullable=True)  # For hierarchical accounts
+    parent_account_code = Column(String(20), nullable=True, index=True)  # For hierarchical accounts
     is_active = Column(Boolean, default=True, nullable=False)
     opening_balance = Column(DECIMAL(15, 2), default=0.00, nullable=False)
     current_balance = Column(DECIMAL(15, 2), default=0.00, nullable=False)
     description = Column(String(255), nullable=True)
-    created_at = Column(DateTime, default=func.now(), nullable=False)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        # Accounts-by-type listing filters on type and active flag together
+        Index('ix_accounts_master_type_active', 'account_type', 'is_active'),
+        # Code generation does `account_code LIKE '2105%' ORDER BY account_code DESC`
+        Index('ix_accounts_master_code_pattern', 'account_code',
+              postgresql_ops={'account_code': 'varchar_pattern_ops'}),
+    )
     
     # Relationships
     # Note: All relationships removed to avoid circular import issues
     # Use explicit queries for related models
 
+    # Balances in integer minor units (paise), for arithmetic-heavy paths
+    opening_balance_minor = scaled_int_property('opening_balance', 100)
+    current_balance_minor = scaled_int_property('current_balance', 100)
+
     def __repr__(self):
-        return f"<AccountsMaster(account_code='{self.account_code}', account_name='{self.account_name}', account_type='{self.account_type}')>"
+        return "<AccountsMaster(account_code='%s', account_name='%s', account_type='%s')>" % (
+            self.account_code, self.account_name, self.account_type)
 
 
 # Create alias for compatibility
@@ -1,27 +1,29 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Sequence
 from sqlalchemy.orm import relationship
 from models.user import Base
+from models.mixins import TimestampMixin
 
+# Running number behind agent account codes (2105001, 2105002, ...)
+agent_acc_code_seq = Sequence("agent_acc_code_seq", start=1, metadata=Base.metadata)
 
-class Agent(Base):
+
+class Agent(TimestampMixin, Base):
     __tablename__ = "agents"
 
     id = Column(Integer, primary_key=True, index=True)
     agent_name = Column(String(100), nullable=False)
     agent_acc_code = Column(String(20), unique=True, nullable=False, index=True)
     address = Column(String(255), nullable=True)
-    state_id = Column(Integer, ForeignKey("states.id"), nullable=True)
+    state_id = Column(Integer, ForeignKey("states.id"), nullable=True, index=True)
     city = Column(String(100), nullable=True)
     phone = Column(String(15), nullable=True)
-    status = Column(String(20), default="Active", nullable=False)  # Active, Inactive, Suspended
-    created_at = Column(DateTime, default=func.now(), nullable=False)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    status = Column(String(20), default="Active", nullable=False, index=True)  # Active, Inactive, Suspended
 
     # Relationships
     state = relationship("State", back_populates="agents")
     customers = relationship("Customer", back_populates="agent")
     suppliers = relationship("Supplier", back_populates="agent")
-    sales_bills = relationship("SalesBill", back_populates="agent")
 
     def __repr__(self):
-        return f"<Agent(agent_name='{self.agent_name}', agent_acc_code='{self.agent_acc_code}', status='{self.status}')>"
+        return "<Agent(agent_name='%s', agent_acc_code='%s', status='%s')>" % (
+            self.agent_name, self.agent_acc_code, self.status)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index, Enum as SQLEnum
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -17,6 +17,18 @@ class TaxType(str, enum.Enum):
     EXCLUDE_TAX = "EXCLUDE_TAX"      # Tax is added on top of item rate
     WITHOUT_TAX = "WITHOUT_TAX"      # No tax calculations needed
 
+    @property
+    def description(self) -> str:
+        """Human-readable explanation of how this tax type is applied"""
+        return _TAX_TYPE_DESCRIPTIONS[self]
+
+
+_TAX_TYPE_DESCRIPTIONS = {
+    TaxType.INCLUDE_TAX: "Tax is included in item rates - will be separated during calculation",
+    TaxType.EXCLUDE_TAX: "Tax will be added on top of item rates",
+    TaxType.WITHOUT_TAX: "No tax calculations needed",
+}
+
 
 class BillBook(Base):
     __tablename__ = "bill_books"
@@ -42,4 +54,8 @@ class BillBook(Base):
     
     # Relationships
     sales = relationship("Sale", back_populates="bill_book")
-    sales_bills = relationship("SalesBill", back_populates="bill_book")
+
+    __table_args__ = (
+        # Bill book listing filters on status and optionally tax type
+        Index('ix_bill_books_status_tax_type', 'status', 'tax_type'),
+    )
@@ -2,11 +2,12 @@ from sqlalchemy import Column, String, Text, Boolean, DateTime
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database import Base
+from models.columns import code_key
 
 class CategoryMaster(Base):
     __tablename__ = "category_master"
     
-    id = Column(String(50), primary_key=True, index=True)
+    id = Column(code_key(), primary_key=True)
     category_name = Column(String(100), nullable=False, unique=True)
     description = Column(Text)
     is_active = Column(Boolean, default=True, nullable=False)
@@ -0,0 +1,70 @@
+from decimal import Decimal
+from sqlalchemy import BigInteger, SmallInteger, String, cast
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.ext.hybrid import hybrid_property
+
+
+class _ScaledIntProperty(hybrid_property):
+    def __set_name__(self, owner, name):
+        # Name the hybrid after its class attribute so SQL labels match it
+        self.__name__ = name
+
+
+def scaled_int_property(column_name: str, scale: int) -> hybrid_property:
+    """Expose a Numeric column as an integer count of 1/scale units.
+
+    Reads return e.g. paise (scale=100) or thousandths (scale=1000) as int,
+    writes convert back to Decimal, and in SQL the property compiles to
+    CAST(column * scale AS BIGINT). Storage type is unchanged.
+    """
+    def fget(self) -> int:
+        return round((getattr(self, column_name) or 0) * scale)
+
+    def fset(self, value: int) -> None:
+        setattr(self, column_name, Decimal(value) / scale)
+
+    def expr(cls):
+        return cast(getattr(cls, column_name) * scale, BigInteger)
+
+    return _ScaledIntProperty(fget, fset, expr=expr)
+
+
+def code_key(length: int = 50) -> String:
+    """String type for master-table code keys (RM001, SIZ001, ...) and their FKs.
+
+    On PostgreSQL the column uses the "C" collation, so index lookups and
+    joins compare raw bytes instead of going through locale-aware strcoll.
+    """
+    return String(length).with_variant(String(length, collation="C"), "postgresql")
+
+
+class SmallIntCode(TypeDecorator):
+    """Store one of a fixed set of string codes as a SMALLINT.
+
+    ``codes`` maps each code to its stored id. The ids are spelled out so
+    entries can be reordered freely; never renumber or reuse one. Python
+    sees plain strings; unknown codes raise ValueError.
+    """
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, codes):
+        super().__init__()
+        self.codes = tuple(codes.items())  # hashable, for the statement cache key
+        self._ids = dict(self.codes)
+        self._codes = {i: code for code, i in self.codes}
+        if len(self._codes) != len(self._ids):
+            raise ValueError("SmallIntCode ids must be unique")
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            return self._ids[value]
+        except KeyError:
+            raise ValueError("unknown code %r" % (value,)) from None
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self._codes[value]
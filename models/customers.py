@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Text, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
 from models.user import Base
+from models.mixins import TimestampMixin
 import enum
 
 
@@ -10,7 +10,7 @@ class CustomerType(enum.Enum):
     UNREGISTERED = "Unregistered"
 
 
-class Customer(Base):
+class Customer(TimestampMixin, Base):
     __tablename__ = "customers"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -39,14 +39,16 @@ class Customer(Base):
     
     # Status and Timestamps
     status = Column(String(20), default="Active", nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     # Relationships
     state = relationship("State", back_populates="customers")
     agent = relationship("Agent", back_populates="customers")
     sales = relationship("Sale", back_populates="customer")
-    sales_bills = relationship("SalesBill", back_populates="customer")
+
+    __table_args__ = (
+        # Customer listing filters on status and optionally customer type
+        Index('ix_customers_status_type', 'status', 'customer_type'),
+    )
 
     @property
     def name(self):
@@ -59,4 +61,4 @@ class Customer(Base):
         return self.customer_acc_code
 
     def __repr__(self):
-        return f"<Customer(id={self.id}, name='{self.customer_name}', type='{self.customer_type}')>"
+        return "<Customer(id=%s, name='%s')>" % (self.id, self.customer_name)
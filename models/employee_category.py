@@ -26,4 +26,4 @@ class EmployeeCategory(Base):
     employees = relationship("Employee", back_populates="category")
 
     def __repr__(self):
-        return f"<EmployeeCategory(id={self.id}, name={self.name}, salary_structure={self.salary_structure})>"
+        return "<EmployeeCategory(id=%s, name=%s)>" % (self.id, self.name)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Float
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -30,5 +30,13 @@ class Employee(Base):
     # Relationship to category
     category = relationship("EmployeeCategory", back_populates="employees")
 
+    __table_args__ = (
+        # Employee listings filter on status and optionally category
+        Index('ix_employees_status_category', 'status', 'category_id'),
+        # Employee id generation does `LIKE 'EMP-%' ORDER BY employee_id DESC`
+        Index('ix_employees_employee_id_pattern', 'employee_id',
+              postgresql_ops={'employee_id': 'varchar_pattern_ops'}),
+    )
+
     def __repr__(self):
-        return f"<Employee(id={self.id}, employee_id={self.employee_id}, name={self.name}, base_rate={self.base_rate})>"
+        return "<Employee(id=%s, employee_id=%s, name=%s)>" % (self.id, self.employee_id, self.name)
@@ -1,10 +1,27 @@
-from sqlalchemy import Column, Integer, String, Boolean, DECIMAL, DateTime, func, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, DECIMAL, DateTime, ForeignKey, Text, Index, case, insert, literal, select, text, type_coerce
 from sqlalchemy.orm import relationship
+from sqlalchemy.ext.hybrid import hybrid_property
 from database import Base
+from models.mixins import AuditMixin, TimestampMixin
+from models.columns import SmallIntCode
 from decimal import Decimal
 
+# DECIMAL columns already load as Decimal; share one zero for the fallbacks
+_ZERO = Decimal('0.00')
 
-class LedgerTransaction(Base):
+# Low-cardinality ledger codes, stored as SMALLINT ids. The ids are persisted:
+# add new codes with new ids, never renumber existing ones.
+REFERENCE_TYPE_CODES = {
+    'PURCHASE_ORDER': 1, 'SALE': 2, 'PAYMENT': 3, 'RECEIPT': 4, 'JOURNAL': 5,
+    'OPENING_BALANCE': 6, 'CLOSING_BALANCE': 7, 'ADJUSTMENT': 8,
+    'PURCHASE': 9, 'PURCHASE_RETURN': 10,
+    'sale': 11,  # lowercase spelling written by routes/sales.py
+}
+VOUCHER_TYPE_CODES = {'JV': 1, 'PV': 2, 'RV': 3, 'SV': 4, 'PurchaseV': 5, 'PRV': 6}
+PARTY_TYPE_CODES = {'CUSTOMER': 1, 'SUPPLIER': 2, 'VENDOR': 3, 'EMPLOYEE': 4, 'AGENT': 5}
+
+
+class LedgerTransaction(AuditMixin, Base):
     """
     Ledger Transaction Model for Double Entry Bookkeeping
     Each transaction affects at least two accounts (debit and credit)
@@ -17,23 +34,23 @@ class LedgerTransaction(Base):
     transaction_date = Column(DateTime, nullable=False, index=True)
     
     # Account Reference - Foreign Key to AccountsMaster
-    account_code = Column(String(20), ForeignKey("accounts_master.account_code"), nullable=False, index=True)
+    account_code = Column(String(20), ForeignKey("accounts_master.account_code"), nullable=False)
     
     # Transaction Details
     description = Column(String(500), nullable=False)
-    reference_type = Column(String(50), nullable=True, index=True)  # 'PURCHASE_ORDER', 'SALE', 'PAYMENT', 'RECEIPT', 'JOURNAL'
+    reference_type = Column(SmallIntCode(REFERENCE_TYPE_CODES), nullable=True)  # 'PURCHASE_ORDER', 'SALE', 'PAYMENT', 'RECEIPT', 'JOURNAL'
     reference_id = Column(String(50), nullable=True, index=True)  # Reference to source document ID
     
     # Financial Fields
-    debit_amount = Column(DECIMAL(15, 2), default=0.00, nullable=False)
-    credit_amount = Column(DECIMAL(15, 2), default=0.00, nullable=False)
+    debit_amount = Column(DECIMAL(15, 2), server_default=text('0'), nullable=False)
+    credit_amount = Column(DECIMAL(15, 2), server_default=text('0'), nullable=False)
     
     # Additional Information
-    voucher_type = Column(String(20), nullable=False)  # 'JV' (Journal), 'PV' (Payment), 'RV' (Receipt), 'SV' (Sales), 'PurchaseV' (Purchase)
+    voucher_type = Column(SmallIntCode(VOUCHER_TYPE_CODES), nullable=False)  # 'JV' (Journal), 'PV' (Payment), 'RV' (Receipt), 'SV' (Sales), 'PurchaseV' (Purchase)
     voucher_number = Column(String(50), nullable=True)
     
     # Party Details (optional)
-    party_type = Column(String(20), nullable=True)  # 'CUSTOMER', 'SUPPLIER', 'VENDOR', 'EMPLOYEE'
+    party_type = Column(SmallIntCode(PARTY_TYPE_CODES), nullable=True)  # 'CUSTOMER', 'SUPPLIER', 'VENDOR', 'EMPLOYEE'
     party_id = Column(String(50), nullable=True)
     party_name = Column(String(200), nullable=True)
     
@@ -45,53 +62,69 @@ class LedgerTransaction(Base):
     is_active = Column(Boolean, default=True, nullable=False)
     is_posted = Column(Boolean, default=True, nullable=False)  # False for draft transactions
     
-    # Audit Fields
-    created_by = Column(String(50), nullable=False)
-    updated_by = Column(String(50), nullable=True)
-    created_at = Column(DateTime, default=func.now(), nullable=False)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
-    
     # Additional Notes
     notes = Column(Text, nullable=True)
     
     # Relationship with AccountsMaster (explicit query recommended to avoid circular imports)
     # account = relationship("AccountsMaster", back_populates="ledger_transactions")
-    
-    # Calculated Properties
-    @property
+
+    __table_args__ = (
+        # Account statements: account_code = ? AND transaction_date range, in date order
+        Index('ix_ledger_acct_date', 'account_code', 'transaction_date'),
+        # Source document lookups: reference_type = ? AND reference_id = ?
+        Index('ix_ledger_ref', 'reference_type', 'reference_id'),
+        # Balance/summary reports only read posted rows
+        Index('ix_ledger_posted_date', 'transaction_date', postgresql_where=text('is_posted = true')),
+        # Draft (unposted) work queue
+        Index('ix_ledger_unposted', 'transaction_date', postgresql_where=text('is_posted = false')),
+    )
+    
+    # Calculated Properties (hybrids, so list queries can select them as columns)
+    @hybrid_property
     def transaction_amount(self):
         """Return the transaction amount (debit or credit, whichever is non-zero)"""
-        try:
-            debit = Decimal(str(self.debit_amount or '0.00'))
-            credit = Decimal(str(self.credit_amount or '0.00'))
-            return debit if debit > Decimal('0.00') else credit
-        except (TypeError, ValueError):
-            return Decimal('0.00')
+        debit = self.debit_amount or _ZERO
+        return debit if debit > _ZERO else (self.credit_amount or _ZERO)
+
+    @transaction_amount.expression
+    def transaction_amount(cls):
+        return case((cls.debit_amount > 0, cls.debit_amount), else_=cls.credit_amount)
     
-    @property
+    @hybrid_property
     def transaction_type(self):
         """Return whether this is a debit or credit transaction"""
-        try:
-            debit = Decimal(str(self.debit_amount or '0.00'))
-            return "DEBIT" if debit > Decimal('0.00') else "CREDIT"
-        except (TypeError, ValueError):
-            return "CREDIT"
+        return "DEBIT" if (self.debit_amount or _ZERO) > _ZERO else "CREDIT"
+
+    @transaction_type.expression
+    def transaction_type(cls):
+        return case((cls.debit_amount > 0, literal("DEBIT")), else_=literal("CREDIT"))
     
-    @property
+    @hybrid_property
     def balance_effect(self):
         """Return the net effect on account balance (debit - credit)"""
-        try:
-            debit = Decimal(str(self.debit_amount or '0.00'))
-            credit = Decimal(str(self.credit_amount or '0.00'))
-            return debit - credit
-        except (TypeError, ValueError):
-            return Decimal('0.00')
+        return (self.debit_amount or _ZERO) - (self.credit_amount or _ZERO)
+
+    @balance_effect.expression
+    def balance_effect(cls):
+        return type_coerce(cls.debit_amount - cls.credit_amount, cls.debit_amount.type)
+
+    @classmethod
+    def bulk_post(cls, session, rows, batch_size=1000):
+        """Insert plain-dict rows with executemany INSERTs of batch_size rows.
+
+        Bypasses the unit of work, so no ORM instances are created and
+        nothing is returned; the caller commits.
+        """
+        for start in range(0, len(rows), batch_size):
+            session.execute(insert(cls), rows[start:start + batch_size])
 
     def __repr__(self):
-        return f"<LedgerTransaction(id={self.id}, transaction_number='{self.transaction_number}', account_code='{self.account_code}', amount={self.transaction_amount})>"
+        # Read loaded state directly so printing an expired row never issues a SELECT
+        d = self.__dict__
+        return f"<LedgerTransaction(id={d.get('id')}, transaction_number='{d.get('transaction_number')}', account_code='{d.get('account_code')}', amount={d.get('debit_amount') or d.get('credit_amount')})>"
 
 
-class TransactionBatch(Base):
+class TransactionBatch(AuditMixin, Base):
     """
     Transaction Batch Model for grouping related transactions
     Useful for ensuring double-entry balance and batch operations
@@ -109,50 +142,55 @@ class TransactionBatch(Base):
     reference_id = Column(String(50), nullable=True, index=True)
     
     # Financial Summary
-    total_debit = Column(DECIMAL(15, 2), default=0.00, nullable=False)
-    total_credit = Column(DECIMAL(15, 2), default=0.00, nullable=False)
+    total_debit = Column(DECIMAL(15, 2), server_default=text('0'), nullable=False)
+    total_credit = Column(DECIMAL(15, 2), server_default=text('0'), nullable=False)
     
     # Status
     is_balanced = Column(Boolean, default=False, nullable=False)  # True when total_debit = total_credit
     is_posted = Column(Boolean, default=False, nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
     
-    # Audit Fields
-    created_by = Column(String(50), nullable=False)
-    updated_by = Column(String(50), nullable=True)
-    created_at = Column(DateTime, default=func.now(), nullable=False)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
-    
     # Notes
     notes = Column(Text, nullable=True)
+
+    __table_args__ = (
+        # Batches still waiting to be posted
+        Index('ix_batches_unposted', 'batch_date', postgresql_where=text('is_posted = false')),
+    )
     
     # Calculated Properties
     @property
     def is_valid_double_entry(self):
         """Check if batch maintains double-entry balance"""
-        try:
-            total_debit = Decimal(str(self.total_debit or '0.00'))
-            total_credit = Decimal(str(self.total_credit or '0.00'))
-            return total_debit == total_credit
-        except (TypeError, ValueError):
-            return False
+        return (self.total_debit or _ZERO) == (self.total_credit or _ZERO)
     
     @property
     def balance_difference(self):
         """Return the difference between debit and credit (should be 0 for valid double-entry)"""
-        try:
-            total_debit = Decimal(str(self.total_debit or '0.00'))
-            total_credit = Decimal(str(self.total_credit or '0.00'))
-            return total_debit - total_credit
-        except (TypeError, ValueError):
-            return Decimal('0.00')
+        return (self.total_debit or _ZERO) - (self.total_credit or _ZERO)
+
+    @classmethod
+    def validate_bulk(cls, session, batch_ids):
+        """Return the ids among batch_ids whose debit and credit totals differ.
+
+        The comparison runs in the database as one statement, so no batch
+        rows or Decimals are materialized for balanced batches.
+        """
+        if not batch_ids:
+            return []
+        return session.scalars(
+            select(cls.id)
+            .where(cls.id.in_(batch_ids), cls.total_debit != cls.total_credit)
+            .order_by(cls.id)
+        ).all()
 
     def __repr__(self):
-        return f"<TransactionBatch(id={self.id}, batch_number='{self.batch_number}', total_debit={self.total_debit}, total_credit={self.total_credit})>"
+        d = self.__dict__
+        return f"<TransactionBatch(id={d.get('id')}, batch_number='{d.get('batch_number')}', total_debit={d.get('total_debit')}, total_credit={d.get('total_credit')})>"
 
 
 # Additional helper model for transaction templates (optional)
-class TransactionTemplate(Base):
+class TransactionTemplate(TimestampMixin, Base):
     """
     Transaction Templates for common recurring transactions
     """
@@ -176,8 +214,7 @@ class TransactionTemplate(Base):
     
     # Audit Fields
     created_by = Column(String(50), nullable=False)
-    created_at = Column(DateTime, default=func.now(), nullable=False)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
 
     def __repr__(self):
-        return f"<TransactionTemplate(template_code='{self.template_code}', template_name='{self.template_name}')>"
+        d = self.__dict__
+        return f"<TransactionTemplate(template_code='{d.get('template_code')}', template_name='{d.get('template_name')}')>"
@@ -0,0 +1,11 @@
+import os
+
+
+# STRICT_LAZY=1 (dev/CI) turns the eager defaults on hot relationships into
+# raise_on_sql, so any load an endpoint did not request explicitly fails loudly
+STRICT_LAZY = bool(os.getenv("STRICT_LAZY"))
+
+
+def default_lazy(strategy: str) -> str:
+    """Return the relationship's normal loader strategy, or raise_on_sql under STRICT_LAZY."""
+    return "raise_on_sql" if STRICT_LAZY else strategy
@@ -0,0 +1,40 @@
+import time
+from sqlalchemy import event
+from auth import TTLCache
+from database import SessionLocal
+
+# Master rows change rarely; each worker keeps its own copy for a few minutes
+# so other workers pick up edits within MASTER_CACHE_TTL
+MASTER_CACHE_MAX_SIZE = 10_000
+MASTER_CACHE_TTL = 300  # seconds
+_master_cache = TTLCache(MASTER_CACHE_MAX_SIZE)
+
+
+class CachedLookupMixin:
+    """Primary-key lookups for reference tables, served from a process cache."""
+
+    @classmethod
+    def get_by_id(cls, key):
+        """Return the row with this primary key, or None.
+
+        The instance is detached and shared between requests: read its
+        columns only, never modify it or walk its relationships.
+        """
+        if key is None:
+            return None
+        cache_key = (cls, key)
+        now = time.time()
+        row = _master_cache.get(cache_key, now)
+        if row is None:
+            with SessionLocal() as session:
+                row = session.get(cls, key)
+            if row is not None:
+                _master_cache.set(cache_key, row, now + MASTER_CACHE_TTL)
+        return row
+
+
+@event.listens_for(CachedLookupMixin, "after_update", propagate=True)
+@event.listens_for(CachedLookupMixin, "after_delete", propagate=True)
+def _invalidate_cached_row(mapper, connection, target):
+    """Drop a changed or deleted row from this worker's cache."""
+    _master_cache.pop((type(target), mapper.primary_key_from_instance(target)[0]))
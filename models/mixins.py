@@ -0,0 +1,14 @@
+from sqlalchemy import Column, DateTime, String
+from sqlalchemy.sql import func
+
+
+class TimestampMixin:
+    """Server-maintained created_at / updated_at columns."""
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+
+class AuditMixin(TimestampMixin):
+    """Timestamps plus the username that created / last updated the row."""
+    created_by = Column(String(50), nullable=False)
+    updated_by = Column(String(50), nullable=True)
@@ -1,8 +1,11 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum as SQLEnum, Numeric
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, CheckConstraint, Index, Numeric, event, insert, select, text, update
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from models.user import Base
+from models.columns import scaled_int_property
 import enum
+from decimal import Decimal
+from itertools import accumulate
 
 
 # Enums for the product management system
@@ -57,7 +60,7 @@ class ProductDesign(Base):
     id = Column(Integer, primary_key=True, index=True)
     design_name = Column(String(100), nullable=False)  # Plain, Checked, Kaaki, Linen, Print
     design_code = Column(String(30), nullable=False, unique=True)  # PLN, CHK, KAK, LIN, PRT
-    design_category = Column(SQLEnum(DesignCategory), nullable=True)
+    design_category = Column(String(20), nullable=True)  # DesignCategory value
     description = Column(Text, nullable=True)
     is_active = Column(Boolean, default=True, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -66,6 +69,10 @@ class ProductDesign(Base):
     # Relationships
     variants = relationship("ProductVariant", back_populates="design")
 
+    __table_args__ = (
+        CheckConstraint(design_category.in_([e.value for e in DesignCategory]), name='ck_product_designs_design_category'),
+    )
+
 
 class Product(Base):
     __tablename__ = "products"
@@ -116,23 +123,38 @@ class ProductVariant(Base):
     
     # Relationships
     product = relationship("Product", back_populates="variants")
-    size = relationship("ProductSize", back_populates="variants")
-    sleeve_type = relationship("ProductSleeveType", back_populates="variants")
-    design = relationship("ProductDesign", back_populates="variants")
+    # Small reference tables shown with every variant; load in the same query
+    size = relationship("ProductSize", back_populates="variants", lazy="joined")
+    sleeve_type = relationship("ProductSleeveType", back_populates="variants", lazy="joined")
+    design = relationship("ProductDesign", back_populates="variants", lazy="joined")
     stock_ledger_entries = relationship("ProductStockLedger", back_populates="variant", cascade="all, delete-orphan")
     sale_items = relationship("SaleItem", back_populates="product_variant")
-    sales_bill_items = relationship("SalesBillItem", back_populates="product_variant")
-    
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        # Auto-generate variant_name on creation if not provided
-        if not self.variant_name:
-            self._generate_variant_name()
-    
-    def _generate_variant_name(self):
-        """Generate variant name from related objects."""
-        # This will be populated after the relationships are loaded
-        pass
+
+    # Stock balance in integer hundredths, for arithmetic-heavy paths
+    stock_balance_units = scaled_int_property('stock_balance', 100)
+
+    __table_args__ = (
+        # Variant listings and stock summary only read active variants
+        Index('ix_product_variants_active', 'product_id', postgresql_where=text('is_active = true')),
+    )
+
+
+@event.listens_for(ProductVariant, 'before_insert')
+def _fill_variant_name(mapper, connection, target):
+    """Persist variant_name at insert time with one JOIN over the four name columns."""
+    if target.variant_name:
+        return
+    row = connection.execute(
+        select(Product.product_name, ProductSize.size_value, ProductSleeveType.sleeve_type, ProductDesign.design_name)
+        .where(
+            Product.id == target.product_id,
+            ProductSize.id == target.size_id,
+            ProductSleeveType.id == target.sleeve_type_id,
+            ProductDesign.id == target.design_id,
+        )
+    ).first()
+    if row is not None:
+        target.variant_name = " - ".join(row)
 
 
 class ProductStockLedger(Base):
@@ -142,7 +164,7 @@ class ProductStockLedger(Base):
     variant_id = Column(Integer, ForeignKey("product_variants.id"), nullable=False)
     
     # Transaction details
-    movement_type = Column(SQLEnum(StockMovementType), nullable=False)
+    movement_type = Column(String(20), nullable=False)  # StockMovementType value
     quantity = Column(Numeric(10, 2), nullable=False)  # Positive for IN, negative for OUT
     unit_price = Column(Numeric(10, 2), nullable=True)  # Price per unit
     balance_after = Column(Numeric(10, 2), nullable=False)  # Stock balance after this transaction
@@ -159,3 +181,47 @@ class ProductStockLedger(Base):
     
     # Relationships
     variant = relationship("ProductVariant", back_populates="stock_ledger_entries")
+
+    __table_args__ = (
+        CheckConstraint(movement_type.in_([e.value for e in StockMovementType]), name='ck_product_stock_ledger_movement_type'),
+    )
+
+    # Quantities in integer hundredths, for running-balance arithmetic
+    quantity_units = scaled_int_property('quantity', 100)
+    balance_after_units = scaled_int_property('balance_after', 100)
+
+    @classmethod
+    def bulk_post(cls, session, rows, batch_size=1000):
+        """Insert plain-dict rows with executemany INSERTs of batch_size rows.
+
+        Bypasses the unit of work, so no ORM instances are created and
+        nothing is returned; the caller commits.
+        """
+        for start in range(0, len(rows), batch_size):
+            session.execute(insert(cls), rows[start:start + batch_size])
+
+    @classmethod
+    def recompute_balances(cls, session, variant_id):
+        """Rebuild balance_after for a variant's ledger and return the final balance.
+
+        The running sum is taken over integer hundredths with
+        itertools.accumulate, and all rows are written back in a single
+        executemany UPDATE by primary key; the caller commits.
+        """
+        rows = session.execute(
+            select(cls.id, cls.movement_type, cls.quantity_units)
+            .where(cls.variant_id == variant_id)
+            .order_by(cls.transaction_date, cls.id)
+        ).all()
+        if not rows:
+            return Decimal('0')
+
+        balances = list(accumulate(
+            -quantity if movement_type == StockMovementType.OUT else quantity
+            for _, movement_type, quantity in rows
+        ))
+        session.execute(
+            update(cls),
+            [{"id": row.id, "balance_after": Decimal(balance) / 100} for row, balance in zip(rows, balances)],
+        )
+        return Decimal(balances[-1]) / 100
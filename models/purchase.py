@@ -1,24 +1,27 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Numeric, ForeignKey, Date, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Numeric, ForeignKey, Date, CheckConstraint, Computed, Index, select, text
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, column_property
+from sqlalchemy.ext.hybrid import hybrid_property
 from decimal import Decimal
 from database import Base
+from models.columns import code_key, scaled_int_property
+from models.mixins import AuditMixin, TimestampMixin
 import enum
 
 
-class PurchaseStatus(enum.Enum):
+class PurchaseStatus(str, enum.Enum):
     DRAFT = "DRAFT"
     POSTED = "POSTED"  
     CANCELLED = "CANCELLED"
 
 
-class PurchaseType(enum.Enum):
+class PurchaseType(str, enum.Enum):
     CASH = "CASH"
     CREDIT = "CREDIT"
     ADVANCE = "ADVANCE"
 
 
-class Purchase(Base):
+class Purchase(AuditMixin, Base):
     """
     Purchase Entry Model - Actual receipt/invoice from suppliers
     Links to Purchase Orders and automatically updates Stock Ledger & Account Ledger
@@ -40,19 +43,20 @@ class Purchase(Base):
     po_number = Column(String(50), nullable=True)
     
     # Purchase Type and Status
-    purchase_type = Column(SQLEnum(PurchaseType), nullable=False, default=PurchaseType.CREDIT)
-    status = Column(SQLEnum(PurchaseStatus), nullable=False, default=PurchaseStatus.DRAFT)
+    # Stored as plain strings; CHECK constraints below restrict them to the enum values
+    purchase_type = Column(String(20), nullable=False, default=PurchaseType.CREDIT.value)
+    status = Column(String(20), nullable=False, default=PurchaseStatus.DRAFT.value)
     
     # Financial Totals
-    sub_total = Column(Numeric(15, 2), default=0.00, nullable=False)
-    tax_amount = Column(Numeric(15, 2), default=0.00, nullable=False)
-    discount_amount = Column(Numeric(15, 2), default=0.00, nullable=False)
-    transport_charges = Column(Numeric(15, 2), default=0.00, nullable=False)
-    other_charges = Column(Numeric(15, 2), default=0.00, nullable=False)
-    total_amount = Column(Numeric(15, 2), default=0.00, nullable=False)
+    sub_total = Column(Numeric(15, 2), server_default=text('0'), nullable=False)
+    tax_amount = Column(Numeric(15, 2), server_default=text('0'), nullable=False)
+    discount_amount = Column(Numeric(15, 2), server_default=text('0'), nullable=False)
+    transport_charges = Column(Numeric(15, 2), server_default=text('0'), nullable=False)
+    other_charges = Column(Numeric(15, 2), server_default=text('0'), nullable=False)
+    total_amount = Column(Numeric(15, 2), server_default=text('0'), nullable=False)
     
     # Payment Information (for cash purchases)
-    amount_paid = Column(Numeric(15, 2), default=0.00, nullable=False)
+    amount_paid = Column(Numeric(15, 2), server_default=text('0'), nullable=False)
     payment_mode = Column(String(20), nullable=True)  # 'CASH', 'BANK', 'CHEQUE'
     payment_reference = Column(String(100), nullable=True)  # Cheque number, transaction ID, etc.
     
@@ -66,23 +70,49 @@ class Purchase(Base):
     is_stock_updated = Column(Boolean, default=False, nullable=False)
     
     # Audit Fields
-    created_by = Column(String(50), nullable=False)
-    updated_by = Column(String(50), nullable=True)
     posted_by = Column(String(50), nullable=True)
     posted_at = Column(DateTime, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     
     # Relationships
     supplier = relationship("Supplier", back_populates="purchases")
-    purchase_order = relationship("PurchaseOrder")
-    items = relationship("PurchaseItem", back_populates="purchase", cascade="all, delete-orphan")
+    purchase_order = relationship("PurchaseOrder", back_populates="purchases")
+    items = relationship("PurchaseItem", back_populates="purchase", cascade="all, delete-orphan", lazy="selectin")
     ledger_batch = relationship("TransactionBatch")
-    
+    returns = relationship("PurchaseReturn", back_populates="purchase")
+
+    __table_args__ = (
+        CheckConstraint(purchase_type.in_([e.value for e in PurchaseType]), name='ck_purchases_purchase_type'),
+        CheckConstraint(status.in_([e.value for e in PurchaseStatus]), name='ck_purchases_status'),
+        # Draft purchases listing
+        Index('ix_purchases_draft', 'purchase_date', postgresql_where=text("status = 'DRAFT'")),
+    )
+    
+    @classmethod
+    def get_subtotals(cls, session, ids):
+        """Return {id: sum of item totals} for the given ids in one grouped query.
+
+        Ids without items are absent from the result.
+        """
+        if not ids:
+            return {}
+        rows = session.execute(
+            select(PurchaseItem.purchase_id, func.sum(PurchaseItem.total_amount))
+            .where(PurchaseItem.purchase_id.in_(ids))
+            .group_by(PurchaseItem.purchase_id)
+        ).all()
+        return dict(rows)
+
     @property
     def calculated_sub_total(self):
-        """Calculate sub total from items"""
-        return sum(item.total_amount for item in self.items) if self.items else Decimal('0.00')
+        """Calculate sub total from items.
+
+        Uses the SQL aggregate (items_sub_total) when it is already loaded,
+        sums in Python when only the items are loaded, and otherwise loads
+        the aggregate instead of the items.
+        """
+        if 'items_sub_total' not in self.__dict__ and 'items' in self.__dict__:
+            return sum((item.total_amount for item in self.items), Decimal('0.00'))
+        return self.items_sub_total
     
     @property
     def calculated_total(self):
@@ -94,23 +124,32 @@ class Purchase(Base):
         discount = self.discount_amount or Decimal('0.00')
         return sub + tax + transport + other - discount
     
-    @property
+    @hybrid_property
     def balance_amount(self):
         """Calculate balance amount: total - amount_paid"""
         total = self.total_amount or Decimal('0.00')
         paid = self.amount_paid or Decimal('0.00')
         return total - paid
+
+    @balance_amount.expression
+    def balance_amount(cls):
+        return func.coalesce(cls.total_amount, 0) - func.coalesce(cls.amount_paid, 0)
     
-    @property
+    @hybrid_property
     def is_fully_paid(self):
         """Check if purchase is fully paid"""
         return self.balance_amount <= Decimal('0.00')
+
+    @is_fully_paid.expression
+    def is_fully_paid(cls):
+        return cls.balance_amount <= 0
     
     def __repr__(self):
-        return f"<Purchase(id={self.id}, purchase_number='{self.purchase_number}', status='{self.status}')>"
+        d = self.__dict__
+        return f"<Purchase(id={d.get('id')}, purchase_number='{d.get('purchase_number')}', status='{d.get('status')}')>"
 
 
-class PurchaseItem(Base):
+class PurchaseItem(TimestampMixin, Base):
     """
     Purchase Item Model - Individual items in a purchase entry
     Automatically updates Stock Ledger when posted
@@ -119,11 +158,11 @@ class PurchaseItem(Base):
     
     # Primary Fields
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    purchase_id = Column(Integer, ForeignKey("purchases.id"), nullable=False, index=True)
+    purchase_id = Column(Integer, ForeignKey("purchases.id"), nullable=False)
     
     # Material Information
-    material_id = Column(String(50), ForeignKey("raw_material_master.id"), nullable=False, index=True)
-    size_id = Column(String(50), ForeignKey("size_master.id"), nullable=False, index=True)
+    material_id = Column(code_key(), ForeignKey("raw_material_master.id"), nullable=False)
+    size_id = Column(code_key(), ForeignKey("size_master.id"), nullable=False, index=True)
     
     # Item Details
     supplier_material_name = Column(String(200), nullable=True)  # Supplier's product name
@@ -131,11 +170,11 @@ class PurchaseItem(Base):
     
     # Quantity and Unit
     quantity = Column(Numeric(15, 3), nullable=False)
-    unit_id = Column(String(50), ForeignKey("unit_master.id"), nullable=False)
+    unit_id = Column(code_key(), ForeignKey("unit_master.id"), nullable=False)
     
     # Pricing
     rate = Column(Numeric(15, 2), nullable=False)
-    total_amount = Column(Numeric(15, 2), nullable=False)  # quantity * rate
+    total_amount = Column(Numeric(15, 2), Computed('quantity * rate', persisted=True))  # maintained by the database
     
     # Purchase Order Reference (optional)
     po_item_id = Column(Integer, ForeignKey("purchase_order_items.id"), nullable=True)
@@ -146,24 +185,36 @@ class PurchaseItem(Base):
     
     # Quality and Inspection
     quality_status = Column(String(20), default="Accepted")  # 'Accepted', 'Rejected', 'Pending'
-    rejected_qty = Column(Numeric(15, 3), default=0.000)
-    accepted_qty = Column(Numeric(15, 3), nullable=False)  # quantity - rejected_qty
+    rejected_qty = Column(Numeric(15, 3), server_default=text('0'))
+    accepted_qty = Column(Numeric(15, 3), Computed('quantity - coalesce(rejected_qty, 0)', persisted=True))  # maintained by the database
     
     # Batch/Lot Information
     batch_number = Column(String(50), nullable=True)
     expiry_date = Column(Date, nullable=True)
     
-    # Audit Fields
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
-    
     # Relationships
     purchase = relationship("Purchase", back_populates="items")
-    material = relationship("RawMaterialMaster")
-    size = relationship("SizeMaster")
-    unit = relationship("UnitMaster")
-    po_item = relationship("PurchaseOrderItem")
+    material = relationship("RawMaterialMaster", back_populates="purchase_items", lazy="joined")
+    size = relationship("SizeMaster", lazy="joined")
+    unit = relationship("UnitMaster", lazy="joined")
+    po_item = relationship("PurchaseOrderItem", back_populates="purchase_items")
+    return_items = relationship("PurchaseReturnItem", back_populates="purchase_item")
     stock_ledger = relationship("StockLedger")
+
+    # Quantities in integer thousandths, for arithmetic-heavy paths
+    quantity_units = scaled_int_property('quantity', 1000)
+    rejected_qty_units = scaled_int_property('rejected_qty', 1000)
+    accepted_qty_units = scaled_int_property('accepted_qty', 1000)
+
+    __table_args__ = (
+        # Items still awaiting stock posting
+        Index('ix_purchase_items_stock_pending', 'purchase_id', postgresql_where=text('is_stock_updated = false')),
+        # Items of a purchase; covers amount totals without a heap fetch
+        Index('ix_purchase_items_purchase_material', 'purchase_id', 'material_id',
+              postgresql_include=['total_amount', 'quantity', 'rate']),
+        # Purchase history for a material
+        Index('ix_purchase_items_material_purchase', 'material_id', 'purchase_id'),
+    )
     
     @property
     def calculated_total(self):
@@ -180,4 +231,15 @@ class PurchaseItem(Base):
         return accepted_qty * rate
     
     def __repr__(self):
-        return f"<PurchaseItem(id={self.id}, purchase_id={self.purchase_id}, material_id='{self.material_id}')>"
+        d = self.__dict__
+        return f"<PurchaseItem(id={d.get('id')}, purchase_id={d.get('purchase_id')}, material_id='{d.get('material_id')}')>"
+
+
+# SUM(purchase_items.total_amount) for a purchase, loaded on first access
+Purchase.items_sub_total = column_property(
+    select(func.coalesce(func.sum(PurchaseItem.total_amount), 0))
+    .where(PurchaseItem.purchase_id == Purchase.id)
+    .correlate_except(PurchaseItem)
+    .scalar_subquery(),
+    deferred=True,
+)
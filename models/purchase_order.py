@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Numeric, ForeignKey, Date
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Numeric, ForeignKey, Date, Computed, select, text
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, column_property
 from decimal import Decimal
 from database import Base
+from models.columns import code_key
 
 class PurchaseOrder(Base):
     __tablename__ = "purchase_orders"
@@ -16,10 +17,10 @@ class PurchaseOrder(Base):
     transport_details = Column(Text, nullable=True)
     
     # Financial fields
-    sub_total = Column(Numeric(15, 2), default=0.00)
-    tax_amount = Column(Numeric(15, 2), default=0.00)
-    discount_amount = Column(Numeric(15, 2), default=0.00)
-    total_amount = Column(Numeric(15, 2), default=0.00)
+    sub_total = Column(Numeric(15, 2), server_default=text('0'))
+    tax_amount = Column(Numeric(15, 2), server_default=text('0'))
+    discount_amount = Column(Numeric(15, 2), server_default=text('0'))
+    total_amount = Column(Numeric(15, 2), server_default=text('0'))
     
     remarks = Column(Text, nullable=True)
     created_by = Column(String(50), nullable=True)
@@ -28,13 +29,36 @@ class PurchaseOrder(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships
-    supplier = relationship("Supplier")
-    items = relationship("PurchaseOrderItem", back_populates="purchase_order", cascade="all, delete-orphan")
+    supplier = relationship("Supplier", back_populates="purchase_orders")
+    items = relationship("PurchaseOrderItem", back_populates="purchase_order", cascade="all, delete-orphan", lazy="selectin")
+    purchases = relationship("Purchase", back_populates="purchase_order")
     
+    @classmethod
+    def get_subtotals(cls, session, ids):
+        """Return {id: sum of item totals} for the given ids in one grouped query.
+
+        Ids without items are absent from the result.
+        """
+        if not ids:
+            return {}
+        rows = session.execute(
+            select(PurchaseOrderItem.po_id, func.sum(PurchaseOrderItem.total_amount))
+            .where(PurchaseOrderItem.po_id.in_(ids))
+            .group_by(PurchaseOrderItem.po_id)
+        ).all()
+        return dict(rows)
+
     @property
     def calculated_sub_total(self):
-        """Calculate sub total from items"""
-        return sum(item.total_amount for item in self.items) if self.items else Decimal('0.00')
+        """Calculate sub total from items.
+
+        Uses the SQL aggregate (items_sub_total) when it is already loaded,
+        sums in Python when only the items are loaded, and otherwise loads
+        the aggregate instead of the items.
+        """
+        if 'items_sub_total' not in self.__dict__ and 'items' in self.__dict__:
+            return sum((item.total_amount for item in self.items), Decimal('0.00'))
+        return self.items_sub_total
     
     @property
     def calculated_total(self):
@@ -45,7 +69,8 @@ class PurchaseOrder(Base):
         return sub + tax - discount
     
     def __repr__(self):
-        return f"<PurchaseOrder(id={self.id}, po_number='{self.po_number}', status='{self.status}')>"
+        d = self.__dict__
+        return f"<PurchaseOrder(id={d.get('id')}, po_number='{d.get('po_number')}', status='{d.get('status')}')>"
 
 
 class PurchaseOrderItem(Base):
@@ -53,17 +78,17 @@ class PurchaseOrderItem(Base):
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     po_id = Column(Integer, ForeignKey("purchase_orders.id"), nullable=False)
-    material_id = Column(String(50), ForeignKey("raw_material_master.id"), nullable=False)
+    material_id = Column(code_key(), ForeignKey("raw_material_master.id"), nullable=False)
     supplier_material_name = Column(String(200), nullable=True)  # Supplier's product name
     description = Column(Text, nullable=True)
     quantity = Column(Numeric(15, 3), nullable=False)
-    unit_id = Column(String(50), ForeignKey("unit_master.id"), nullable=False)  # Link to unit master
+    unit_id = Column(code_key(), ForeignKey("unit_master.id"), nullable=False)  # Link to unit master
     rate = Column(Numeric(15, 2), nullable=False)
-    total_amount = Column(Numeric(15, 2), nullable=False)  # qty * rate
+    total_amount = Column(Numeric(15, 2), Computed('quantity * rate', persisted=True))  # maintained by the database
     
     # Tracking fields
-    received_qty = Column(Numeric(15, 3), default=0.000)
-    pending_qty = Column(Numeric(15, 3), nullable=False)  # quantity - received_qty
+    received_qty = Column(Numeric(15, 3), server_default=text('0'))
+    pending_qty = Column(Numeric(15, 3), Computed('quantity - coalesce(received_qty, 0)', persisted=True))  # maintained by the database
     item_status = Column(String(20), default="Pending")  # Pending, Partial, Received, Cancelled
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -71,8 +96,20 @@ class PurchaseOrderItem(Base):
     
     # Relationships
     purchase_order = relationship("PurchaseOrder", back_populates="items")
-    material = relationship("RawMaterialMaster")
-    unit = relationship("UnitMaster")
+    material = relationship("RawMaterialMaster", back_populates="purchase_order_items", lazy="joined")
+    unit = relationship("UnitMaster", lazy="joined")
+    purchase_items = relationship("PurchaseItem", back_populates="po_item")
     
     def __repr__(self):
-        return f"<PurchaseOrderItem(id={self.id}, po_id={self.po_id}, material_id='{self.material_id}')>"
+        d = self.__dict__
+        return f"<PurchaseOrderItem(id={d.get('id')}, po_id={d.get('po_id')}, material_id='{d.get('material_id')}')>"
+
+
+# SUM(purchase_order_items.total_amount) for a PO, loaded on first access
+PurchaseOrder.items_sub_total = column_property(
+    select(func.coalesce(func.sum(PurchaseOrderItem.total_amount), 0))
+    .where(PurchaseOrderItem.po_id == PurchaseOrder.id)
+    .correlate_except(PurchaseOrderItem)
+    .scalar_subquery(),
+    deferred=True,
+)
@@ -1,18 +1,23 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Numeric, ForeignKey, Date, Enum as SQLEnum
+from sqlalchemy import Column, Computed, Integer, String, Text, Boolean, DateTime, Numeric, ForeignKey, Date, CheckConstraint, Index, event, inspect, text
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
-from decimal import Decimal
+from sqlalchemy.orm import Session, relationship
+from sqlalchemy.ext.hybrid import hybrid_property
+from decimal import Decimal, ROUND_HALF_UP
 from database import Base
+from models.columns import code_key, scaled_int_property
+from models.loading import default_lazy
+from models.mixins import AuditMixin, TimestampMixin
+from itertools import chain
 import enum
 
 
-class PurchaseReturnStatus(enum.Enum):
+class PurchaseReturnStatus(str, enum.Enum):
     DRAFT = "Draft"
     POSTED = "Posted"
     CANCELLED = "Cancelled"
 
 
-class ReturnReason(enum.Enum):
+class ReturnReason(str, enum.Enum):
     DEFECTIVE = "Defective"
     EXCESS_QUANTITY = "Excess Quantity"
     WRONG_ITEM = "Wrong Item"
@@ -22,7 +27,7 @@ class ReturnReason(enum.Enum):
     OTHER = "Other"
 
 
-class PurchaseReturn(Base):
+class PurchaseReturn(AuditMixin, Base):
     """
     Purchase Return Model - Returns to suppliers
     Automatically creates reverse transactions in Stock Ledger & Account Ledger
@@ -35,22 +40,23 @@ class PurchaseReturn(Base):
     return_date = Column(Date, nullable=False, index=True)
     
     # Supplier Information
-    supplier_id = Column(Integer, ForeignKey("suppliers.id"), nullable=False, index=True)
+    supplier_id = Column(Integer, ForeignKey("suppliers.id"), nullable=False)
     
     # Reference to Original Purchase
     purchase_id = Column(Integer, ForeignKey("purchases.id"), nullable=False, index=True)
     purchase_number = Column(String(50), nullable=True)
     
     # Return Details
-    return_reason = Column(SQLEnum(ReturnReason), nullable=False)
-    status = Column(SQLEnum(PurchaseReturnStatus), nullable=False, default=PurchaseReturnStatus.DRAFT)
+    # Stored as plain strings; CHECK constraints below restrict them to the enum values
+    return_reason = Column(String(20), nullable=False)
+    status = Column(String(20), nullable=False, default=PurchaseReturnStatus.DRAFT.value)
     
     # Supplier Credit Note Details
     supplier_credit_note_number = Column(String(100), nullable=True)
     supplier_credit_note_date = Column(Date, nullable=True)
     
     # Financial Totals
-    sub_total = Column(Numeric(15, 2), default=0.00, nullable=False)
+    sub_total = Column(Numeric(15, 2), default=0.00, nullable=False)  # Rolled up from items on flush
     tax_amount = Column(Numeric(15, 2), default=0.00, nullable=False)
     discount_amount = Column(Numeric(15, 2), default=0.00, nullable=False)
     transport_charges = Column(Numeric(15, 2), default=0.00, nullable=False)
@@ -83,51 +89,63 @@ class PurchaseReturn(Base):
     approved_at = Column(DateTime, nullable=True)
     
     # Audit Fields
-    created_by = Column(String(50), nullable=False)
-    updated_by = Column(String(50), nullable=True)
     posted_by = Column(String(50), nullable=True)
     posted_at = Column(DateTime, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     
     # Relationships
-    supplier = relationship("Supplier")
-    purchase = relationship("Purchase")
-    items = relationship("PurchaseReturnItem", back_populates="purchase_return", cascade="all, delete-orphan")
+    supplier = relationship("Supplier", back_populates="purchase_returns")
+    purchase = relationship("Purchase", back_populates="returns")
+    items = relationship("PurchaseReturnItem", back_populates="purchase_return", cascade="all, delete-orphan", passive_deletes=True, lazy=default_lazy("selectin"))
     ledger_batch = relationship("TransactionBatch")
-    
-    @property
-    def calculated_sub_total(self):
-        """Calculate sub total from items"""
-        return sum(item.total_amount for item in self.items) if self.items else Decimal('0.00')
-    
-    @property
-    def calculated_total(self):
-        """Calculate final total: sub_total + tax + transport + other - discount"""
-        sub = self.calculated_sub_total
-        tax = self.tax_amount or Decimal('0.00')
-        transport = self.transport_charges or Decimal('0.00')
-        other = self.other_charges or Decimal('0.00')
-        discount = self.discount_amount or Decimal('0.00')
-        return sub + tax + transport + other - discount
-    
-    @property
+    approvals = relationship("PurchaseReturnApproval", back_populates="purchase_return", passive_deletes=True)
+
+    # Amounts in integer minor units (paise), for arithmetic-heavy paths
+    sub_total_minor = scaled_int_property('sub_total', 100)
+    tax_amount_minor = scaled_int_property('tax_amount', 100)
+    discount_amount_minor = scaled_int_property('discount_amount', 100)
+    transport_charges_minor = scaled_int_property('transport_charges', 100)
+    other_charges_minor = scaled_int_property('other_charges', 100)
+    total_amount_minor = scaled_int_property('total_amount', 100)
+    refund_amount_minor = scaled_int_property('refund_amount', 100)
+
+    __table_args__ = (
+        CheckConstraint(return_reason.in_([e.value for e in ReturnReason]), name='ck_purchase_returns_return_reason'),
+        CheckConstraint(status.in_([e.value for e in PurchaseReturnStatus]), name='ck_purchase_returns_status'),
+        # Return list filters by supplier or status over a date range;
+        # supplier_id alone is served by the left prefix
+        Index('ix_purchase_returns_supplier_date', 'supplier_id', 'return_date'),
+        Index('ix_purchase_returns_status_date', 'status', 'return_date'),
+        # Approval queue: only returns still waiting on an approver
+        Index('ix_purchase_returns_pending_approval', 'created_at',
+              postgresql_where=text('approval_required = true AND approved_by IS NULL')),
+    )
+    
+    @hybrid_property
     def pending_refund_amount(self):
         """Calculate pending refund amount"""
         total = self.total_amount or Decimal('0.00')
         refunded = self.refund_amount or Decimal('0.00')
         return total - refunded
+
+    @pending_refund_amount.expression
+    def pending_refund_amount(cls):
+        return func.coalesce(cls.total_amount, 0) - func.coalesce(cls.refund_amount, 0)
     
-    @property
+    @hybrid_property
     def is_fully_refunded(self):
         """Check if return is fully refunded"""
         return self.pending_refund_amount <= Decimal('0.00')
+
+    @is_fully_refunded.expression
+    def is_fully_refunded(cls):
+        return cls.pending_refund_amount <= 0
     
     def __repr__(self):
-        return f"<PurchaseReturn(id={self.id}, return_number='{self.return_number}', status='{self.status}')>"
+        d = self.__dict__
+        return f"<PurchaseReturn(id={d.get('id')}, return_number='{d.get('return_number')}', status='{d.get('status')}')>"
 
 
-class PurchaseReturnItem(Base):
+class PurchaseReturnItem(TimestampMixin, Base):
     """
     Purchase Return Item Model - Individual items in a return
     Automatically updates Stock Ledger with negative quantities
@@ -136,14 +154,14 @@ class PurchaseReturnItem(Base):
     
     # Primary Fields
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    return_id = Column(Integer, ForeignKey("purchase_returns.id"), nullable=False, index=True)
+    return_id = Column(Integer, ForeignKey("purchase_returns.id", ondelete="CASCADE"), nullable=False, index=True)
     
     # Reference to Original Purchase Item
     purchase_item_id = Column(Integer, ForeignKey("purchase_items.id"), nullable=False, index=True)
     
     # Material Information
-    material_id = Column(String(50), ForeignKey("raw_material_master.id"), nullable=False, index=True)
-    size_id = Column(String(50), ForeignKey("size_master.id"), nullable=False, index=True)
+    material_id = Column(code_key(), ForeignKey("raw_material_master.id"), nullable=False, index=True)
+    size_id = Column(code_key(), ForeignKey("size_master.id"), nullable=False, index=True)
     
     # Item Details
     supplier_material_name = Column(String(200), nullable=True)
@@ -151,14 +169,14 @@ class PurchaseReturnItem(Base):
     
     # Quantity and Unit
     return_quantity = Column(Numeric(15, 3), nullable=False)
-    unit_id = Column(String(50), ForeignKey("unit_master.id"), nullable=False)
+    unit_id = Column(code_key(), ForeignKey("unit_master.id"), nullable=False)
     
     # Pricing (from original purchase)
     rate = Column(Numeric(15, 2), nullable=False)
-    total_amount = Column(Numeric(15, 2), nullable=False)  # return_quantity * rate
+    total_amount = Column(Numeric(15, 2), Computed("return_quantity * rate", persisted=True))  # Generated by the database
     
     # Return Specific Details
-    return_reason = Column(SQLEnum(ReturnReason), nullable=False)
+    return_reason = Column(String(20), nullable=False)  # ReturnReason value
     condition_on_return = Column(String(100), nullable=True)  # 'Good', 'Damaged', 'Defective'
     
     # Stock Ledger Integration
@@ -173,27 +191,22 @@ class PurchaseReturnItem(Base):
     quality_check_status = Column(String(20), default="Pending")  # 'Pending', 'Approved', 'Rejected'
     quality_notes = Column(Text, nullable=True)
     
-    # Audit Fields
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
-    
     # Relationships
     purchase_return = relationship("PurchaseReturn", back_populates="items")
-    purchase_item = relationship("PurchaseItem")
-    material = relationship("RawMaterialMaster")
-    size = relationship("SizeMaster")
-    unit = relationship("UnitMaster")
+    purchase_item = relationship("PurchaseItem", back_populates="return_items")
+    # Masters are read through RawMaterialMaster/SizeMaster/UnitMaster.get_by_id(), not joined per item
+    material = relationship("RawMaterialMaster", back_populates="purchase_return_items", lazy="raise_on_sql")
+    size = relationship("SizeMaster", lazy="raise_on_sql")
+    unit = relationship("UnitMaster", lazy="raise_on_sql")
     stock_ledger = relationship("StockLedger")
-    
-    @property
-    def calculated_total(self):
-        """Calculate total: return_quantity * rate"""
-        qty = self.return_quantity or Decimal('0.00')
-        rate = self.rate or Decimal('0.00')
-        return qty * rate
+
+    __table_args__ = (
+        CheckConstraint(return_reason.in_([e.value for e in ReturnReason]), name='ck_purchase_return_items_return_reason'),
+    )
     
     def __repr__(self):
-        return f"<PurchaseReturnItem(id={self.id}, return_id={self.return_id}, material_id='{self.material_id}')>"
+        d = self.__dict__
+        return f"<PurchaseReturnItem(id={d.get('id')}, return_id={d.get('return_id')}, material_id='{d.get('material_id')}')>"
 
 
 class PurchaseReturnApproval(Base):
@@ -204,7 +217,7 @@ class PurchaseReturnApproval(Base):
     __tablename__ = "purchase_return_approvals"
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    return_id = Column(Integer, ForeignKey("purchase_returns.id"), nullable=False, index=True)
+    return_id = Column(Integer, ForeignKey("purchase_returns.id", ondelete="CASCADE"), nullable=False, index=True)
     
     # Approval Details
     approver_id = Column(String(50), nullable=False)
@@ -222,7 +235,48 @@ class PurchaseReturnApproval(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     # Relationships
-    purchase_return = relationship("PurchaseReturn")
+    purchase_return = relationship("PurchaseReturn", back_populates="approvals")
     
     def __repr__(self):
-        return f"<PurchaseReturnApproval(id={self.id}, return_id={self.return_id}, status='{self.status}')>"
+        d = self.__dict__
+        return f"<PurchaseReturnApproval(id={d.get('id')}, return_id={d.get('return_id')}, status='{d.get('status')}')>"
+
+
+# Item total_amount is stored as NUMERIC(15, 2), so lines round to the cent
+_CENT = Decimal('0.01')
+
+# Charges that feed PurchaseReturn.total_amount alongside sub_total
+_RETURN_TOTAL_FIELDS = ('items', 'tax_amount', 'discount_amount', 'transport_charges', 'other_charges')
+
+
+@event.listens_for(Session, 'before_flush')
+def _roll_up_return_totals(session, flush_context, instances):
+    """Persist sub_total/total_amount of returns whose items or charges changed in this flush."""
+    returns = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, PurchaseReturnItem):
+            if obj.purchase_return is not None:
+                returns.add(obj.purchase_return)
+        elif isinstance(obj, PurchaseReturn):
+            state = inspect(obj)
+            if state.pending or any(state.attrs[f].history.has_changes() for f in _RETURN_TOTAL_FIELDS):
+                returns.add(obj)
+
+    deleted = session.deleted
+    with session.no_autoflush:
+        for ret in returns:
+            if ret in deleted:
+                continue
+            # Sum lines rounded as the database stores them, so the header matches its items
+            sub_total = sum(
+                (
+                    (Decimal(item.return_quantity or 0) * (item.rate or 0)).quantize(_CENT, ROUND_HALF_UP)
+                    for item in ret.items if item not in deleted
+                ),
+                Decimal('0.00'),
+            )
+            ret.sub_total = sub_total
+            ret.total_amount = (
+                sub_total + (ret.tax_amount or 0) + (ret.transport_charges or 0)
+                + (ret.other_charges or 0) - (ret.discount_amount or 0)
+            )
@@ -2,16 +2,18 @@ from sqlalchemy import Column, String, Text, Boolean, DateTime, Numeric, Foreign
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database import Base
+from models.columns import code_key
+from models.master_cache import CachedLookupMixin
 
-class RawMaterialMaster(Base):
+class RawMaterialMaster(CachedLookupMixin, Base):
     __tablename__ = "raw_material_master"
     
-    id = Column(String(50), primary_key=True, index=True)
+    id = Column(code_key(), primary_key=True)
     material_name = Column(String(100), nullable=False)
     material_code = Column(String(50), nullable=False, unique=True)
-    category_id = Column(String(50), ForeignKey("category_master.id"), nullable=False)
-    size_id = Column(String(50), ForeignKey("size_master.id"), nullable=False)
-    unit_id = Column(String(50), ForeignKey("unit_master.id"), nullable=False)
+    category_id = Column(code_key(), ForeignKey("category_master.id"), nullable=False)
+    size_id = Column(code_key(), ForeignKey("size_master.id"), nullable=False)
+    unit_id = Column(code_key(), ForeignKey("unit_master.id"), nullable=False)
     standard_rate = Column(Numeric(15, 2), default=0.00)
     minimum_stock = Column(Numeric(15, 2), default=0.00)
     maximum_stock = Column(Numeric(15, 2), default=0.00)
@@ -25,4 +27,7 @@ class RawMaterialMaster(Base):
     category = relationship("CategoryMaster", back_populates="raw_materials")
     size = relationship("SizeMaster", back_populates="raw_materials") 
     unit = relationship("UnitMaster", back_populates="raw_materials")
+    purchase_order_items = relationship("PurchaseOrderItem", back_populates="material")
+    purchase_items = relationship("PurchaseItem", back_populates="material")
+    purchase_return_items = relationship("PurchaseReturnItem", back_populates="material")
     # stock_ledger_entries = relationship("StockLedger", back_populates="raw_material")  # Temporarily disabled
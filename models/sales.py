@@ -1,15 +1,16 @@
-from sqlalchemy import Column, Integer, String, Numeric, Date, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Numeric, Date, Boolean, Text, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from models.user import Base
-from datetime import datetime
+from models.loading import default_lazy
+from models.mixins import TimestampMixin
 
-class Sale(Base):
+class Sale(TimestampMixin, Base):
     """Sales master table"""
     __tablename__ = "sales"
     
     id = Column(Integer, primary_key=True, index=True)
     sale_number = Column(String(50), unique=True, nullable=False, index=True)
-    sale_date = Column(Date, nullable=False, index=True)
+    sale_date = Column(Date, nullable=False)
     customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False)
     bill_book_id = Column(Integer, ForeignKey("bill_books.id"), nullable=False)  # Reference to bill book
     
@@ -33,27 +34,30 @@ class Sale(Base):
     status = Column(String(20), nullable=False, default="draft")  # draft, confirmed, shipped, completed, cancelled
     is_active = Column(Boolean, default=True)
     
-    # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Audit fields
     created_by = Column(Integer, ForeignKey("users.id"))
     updated_by = Column(Integer, ForeignKey("users.id"))
     
     # Relationships
     customer = relationship("Customer", back_populates="sales")
     bill_book = relationship("BillBook", back_populates="sales")
-    sale_items = relationship("SaleItem", back_populates="sale", cascade="all, delete-orphan")
-    sale_payments = relationship("SalePayment", back_populates="sale", cascade="all, delete-orphan")
+    sale_items = relationship("SaleItem", back_populates="sale", cascade="all, delete-orphan", passive_deletes=True, lazy=default_lazy("selectin"))
+    sale_payments = relationship("SalePayment", back_populates="sale", cascade="all, delete-orphan", passive_deletes=True, lazy=default_lazy("selectin"))
     creator = relationship("User", foreign_keys=[created_by])
     updater = relationship("User", foreign_keys=[updated_by])
 
+    __table_args__ = (
+        # Sale listings and reports filter on active sales by date
+        Index('ix_sales_active_date', 'sale_date', postgresql_where=text('is_active = true')),
+    )
 
-class SaleItem(Base):
+
+class SaleItem(TimestampMixin, Base):
     """Sales item details table"""
     __tablename__ = "sale_items"
     
     id = Column(Integer, primary_key=True, index=True)
-    sale_id = Column(Integer, ForeignKey("sales.id"), nullable=False)
+    sale_id = Column(Integer, ForeignKey("sales.id", ondelete="CASCADE"), nullable=False)
     product_variant_id = Column(Integer, ForeignKey("product_variants.id"), nullable=False)
     
     # Item details
@@ -72,21 +76,17 @@ class SaleItem(Base):
     # Stock tracking
     stock_deducted = Column(Boolean, default=False)
     
-    # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    
     # Relationships
     sale = relationship("Sale", back_populates="sale_items")
-    product_variant = relationship("ProductVariant", back_populates="sale_items")
+    product_variant = relationship("ProductVariant", back_populates="sale_items", lazy=default_lazy("joined"), innerjoin=True)
 
 
-class SalePayment(Base):
+class SalePayment(TimestampMixin, Base):
     """Sales payment tracking table"""
     __tablename__ = "sale_payments"
     
     id = Column(Integer, primary_key=True, index=True)
-    sale_id = Column(Integer, ForeignKey("sales.id"), nullable=False)
+    sale_id = Column(Integer, ForeignKey("sales.id", ondelete="CASCADE"), nullable=False)
     
     # Payment details
     payment_date = Column(Date, nullable=False)
@@ -106,9 +106,7 @@ class SalePayment(Base):
     # Account transaction reference (optional)
     transaction_id = Column(Integer, nullable=True)
     
-    # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Audit fields
     created_by = Column(Integer, ForeignKey("users.id"))
     
     # Relationships
@@ -1,9 +1,11 @@
-from sqlalchemy import Column, Integer, String, Numeric, Date, DateTime, Boolean, Text, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Computed, Integer, String, Numeric, Date, Boolean, Text, ForeignKey, CheckConstraint, Index, JSON, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
 from models.user import Base
+from models.columns import scaled_int_property
+from models.loading import default_lazy
+from models.mixins import TimestampMixin
 import enum
-from datetime import datetime
 
 
 class SalesBillStatus(str, enum.Enum):
@@ -40,7 +42,7 @@ class TaxType(str, enum.Enum):
     WITHOUT_TAX = "WITHOUT_TAX"
 
 
-class SalesBill(Base):
+class SalesBill(TimestampMixin, Base):
     """
     Sales Bill Master Table
     Complete sales invoice with all financial details
@@ -50,12 +52,12 @@ class SalesBill(Base):
     # Primary identification
     id = Column(Integer, primary_key=True, index=True)
     bill_number = Column(String(50), unique=True, nullable=False, index=True)
-    bill_date = Column(Date, nullable=False, index=True)
+    bill_date = Column(Date, nullable=False)
     due_date = Column(Date, nullable=True)
     
     # Bill book and tax information
     bill_book_id = Column(Integer, ForeignKey("bill_books.id"), nullable=False)
-    tax_type = Column(SQLEnum(TaxType), nullable=False)  # Copied from bill book at creation
+    tax_type = Column(String(20), nullable=False)  # TaxType value, copied from bill book at creation
     
     # Party information
     customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False)
@@ -85,12 +87,12 @@ class SalesBill(Base):
     net_amount = Column(Numeric(15, 2), nullable=False, default=0.00)         # Final payable amount
     
     # Payment tracking
-    payment_status = Column(SQLEnum(SalesBillPaymentStatus), nullable=False, default=SalesBillPaymentStatus.PENDING)
+    payment_status = Column(String(20), nullable=False, default=SalesBillPaymentStatus.PENDING.value)
     paid_amount = Column(Numeric(15, 2), nullable=False, default=0.00)
     balance_amount = Column(Numeric(15, 2), nullable=False, default=0.00)
     
     # Additional information
-    sale_type = Column(SQLEnum(SalesBillType), nullable=False, default=SalesBillType.REGULAR)
+    sale_type = Column(String(20), nullable=False, default=SalesBillType.REGULAR.value)
     reference_number = Column(String(100), nullable=True)  # Customer PO number, etc.
     remarks = Column(Text, nullable=True)
     internal_notes = Column(Text, nullable=True)  # Internal notes not printed on invoice
@@ -100,7 +102,7 @@ class SalesBill(Base):
     delivery_terms = Column(String(200), nullable=True)
     
     # Status and workflow
-    status = Column(SQLEnum(SalesBillStatus), nullable=False, default=SalesBillStatus.DRAFT)
+    status = Column(String(20), nullable=False, default=SalesBillStatus.DRAFT.value)
     is_active = Column(Boolean, default=True)
     is_printed = Column(Boolean, default=False)
     print_count = Column(Integer, default=0)
@@ -109,23 +111,50 @@ class SalesBill(Base):
     accounts_updated = Column(Boolean, default=False)    # Whether accounts have been updated
     stock_updated = Column(Boolean, default=False)       # Whether stock has been deducted
     
+    # Frozen copy of the items, written when the bill is completed; reads of
+    # completed bills serve items from here instead of sales_bill_items
+    items_snapshot = Column(JSON().with_variant(JSONB, "postgresql"), nullable=True)
+    
     # Audit fields
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
     updated_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     
     # Relationships
-    bill_book = relationship("BillBook", back_populates="sales_bills")
-    customer = relationship("Customer", back_populates="sales_bills")
-    agent = relationship("Agent", back_populates="sales_bills")
-    items = relationship("SalesBillItem", back_populates="sales_bill", cascade="all, delete-orphan")
-    payments = relationship("SalesBillPayment", back_populates="sales_bill", cascade="all, delete-orphan")
+    # One-way: nothing walks from a bill book, customer or agent to its bills
+    bill_book = relationship("BillBook")
+    customer = relationship("Customer")
+    agent = relationship("Agent")
+    items = relationship("SalesBillItem", back_populates="sales_bill", cascade="all, delete-orphan", passive_deletes=True, lazy=default_lazy("selectin"))
+    payments = relationship("SalesBillPayment", back_populates="sales_bill", cascade="all, delete-orphan", passive_deletes=True, lazy=default_lazy("selectin"))
     creator = relationship("User", foreign_keys=[created_by])
     updater = relationship("User", foreign_keys=[updated_by])
 
-
-class SalesBillItem(Base):
+    # Amounts in integer minor units (paise), for arithmetic-heavy paths
+    gross_amount_minor = scaled_int_property('gross_amount', 100)
+    discount_amount_minor = scaled_int_property('discount_amount', 100)
+    taxable_amount_minor = scaled_int_property('taxable_amount', 100)
+    tax_amount_minor = scaled_int_property('tax_amount', 100)
+    adjustment_amount_minor = scaled_int_property('adjustment_amount', 100)
+    net_amount_minor = scaled_int_property('net_amount', 100)
+    paid_amount_minor = scaled_int_property('paid_amount', 100)
+    balance_amount_minor = scaled_int_property('balance_amount', 100)
+
+    __table_args__ = (
+        # Enum columns are stored as plain strings restricted to the enum values
+        CheckConstraint(tax_type.in_([e.value for e in TaxType]), name='ck_sales_bills_tax_type'),
+        CheckConstraint(payment_status.in_([e.value for e in SalesBillPaymentStatus]), name='ck_sales_bills_payment_status'),
+        CheckConstraint(sale_type.in_([e.value for e in SalesBillType]), name='ck_sales_bills_sale_type'),
+        CheckConstraint(status.in_([e.value for e in SalesBillStatus]), name='ck_sales_bills_status'),
+        # Sales bill list filters (customer / status / payment status) over a date range
+        Index('ix_sales_bills_customer_date', 'customer_id', 'bill_date'),
+        Index('ix_sales_bills_status_date', 'status', 'bill_date'),
+        Index('ix_sales_bills_payment_due', 'payment_status', 'due_date'),
+        # Date scans only ever read active bills; leave inactive rows out of the index
+        Index('ix_sales_bills_active_date', 'bill_date', postgresql_where=text('is_active = true')),
+    )
+
+
+class SalesBillItem(TimestampMixin, Base):
     """
     Sales Bill Items Table
     Individual line items in a sales bill
@@ -134,13 +163,13 @@ class SalesBillItem(Base):
     
     # Primary identification
     id = Column(Integer, primary_key=True, index=True)
-    sales_bill_id = Column(Integer, ForeignKey("sales_bills.id"), nullable=False)
+    sales_bill_id = Column(Integer, ForeignKey("sales_bills.id", ondelete="CASCADE"), nullable=False, index=True)
     item_sequence = Column(Integer, nullable=False)  # Line number in bill
     
     # Product information
     product_variant_id = Column(Integer, ForeignKey("product_variants.id"), nullable=False)
     sku_code = Column(String(50), nullable=False, index=True)
-    product_name = Column(String(300), nullable=False)
+    product_name = Column(String(200), nullable=False)  # Same width as Product.product_name
     product_description = Column(Text, nullable=True)
     
     # HSN and tax information
@@ -153,7 +182,7 @@ class SalesBillItem(Base):
     rate = Column(Numeric(15, 2), nullable=False)  # Rate per unit
     
     # Amount calculations
-    gross_amount = Column(Numeric(15, 2), nullable=False)  # quantity * rate
+    gross_amount = Column(Numeric(15, 2), Computed("quantity * rate", persisted=True))  # Generated by the database
     discount_percentage = Column(Numeric(5, 2), nullable=False, default=0.00)
     discount_amount = Column(Numeric(15, 2), nullable=False, default=0.00)
     
@@ -171,16 +200,12 @@ class SalesBillItem(Base):
     expiry_date = Column(Date, nullable=True)
     remarks = Column(Text, nullable=True)
     
-    # Audit fields
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
-    
     # Relationships
     sales_bill = relationship("SalesBill", back_populates="items")
-    product_variant = relationship("ProductVariant", back_populates="sales_bill_items")
+    product_variant = relationship("ProductVariant", lazy=default_lazy("joined"), innerjoin=True)
 
 
-class SalesBillPayment(Base):
+class SalesBillPayment(TimestampMixin, Base):
     """
     Sales Bill Payment Tracking
     Records all payments received against sales bills
@@ -189,7 +214,7 @@ class SalesBillPayment(Base):
     
     # Primary identification
     id = Column(Integer, primary_key=True, index=True)
-    sales_bill_id = Column(Integer, ForeignKey("sales_bills.id"), nullable=False)
+    sales_bill_id = Column(Integer, ForeignKey("sales_bills.id", ondelete="CASCADE"), nullable=False, index=True)
     
     # Payment details
     payment_date = Column(Date, nullable=False, index=True)
@@ -216,30 +241,11 @@ class SalesBillPayment(Base):
     receipt_number = Column(String(50), nullable=True)
     
     # Audit fields
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
     
     # Relationships
     sales_bill = relationship("SalesBill", back_populates="payments")
     creator = relationship("User")
 
-
-# Update related models to establish relationships
-# This will be imported by other models
-
-def update_related_models():
-    """
-    Function to update related models with sales bill relationships
-    Call this after all models are loaded
-    """
-    from models.bill_book import BillBook
-    from models.customers import Customer
-    from models.agents import Agent
-    from models.product_management import ProductVariant
-    
-    # Add relationships to existing models
-    BillBook.sales_bills = relationship("SalesBill", back_populates="bill_book")
-    Customer.sales_bills = relationship("SalesBill", back_populates="customer")
-    Agent.sales_bills = relationship("SalesBill", back_populates="agent")
-    ProductVariant.sales_bill_items = relationship("SalesBillItem", back_populates="product_variant")
+    # Amount in integer minor units (paise)
+    payment_amount_minor = scaled_int_property('payment_amount', 100)
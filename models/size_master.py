@@ -2,11 +2,13 @@ from sqlalchemy import Column, String, Text, Boolean, DateTime
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database import Base
+from models.columns import code_key
+from models.master_cache import CachedLookupMixin
 
-class SizeMaster(Base):
+class SizeMaster(CachedLookupMixin, Base):
     __tablename__ = "size_master"
     
-    id = Column(String(50), primary_key=True, index=True)
+    id = Column(code_key(), primary_key=True)
     size_name = Column(String(100), nullable=False, unique=True)
     size_code = Column(String(20), nullable=False, unique=True)
     description = Column(Text)
@@ -1,8 +1,9 @@
 from sqlalchemy import Column, Integer, String
 from sqlalchemy.orm import relationship
 from models.user import Base
+from models.master_cache import CachedLookupMixin
 
-class State(Base):
+class State(CachedLookupMixin, Base):
     __tablename__ = 'states'
     
     id = Column(Integer, primary_key=True, index=True)  # Keep original column name
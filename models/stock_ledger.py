@@ -1,43 +1,57 @@
-from sqlalchemy import Column, Integer, String, DateTime, Numeric, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Numeric, Date, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
 from database import Base
+from models.columns import code_key, scaled_int_property
+from models.mixins import TimestampMixin
 from decimal import Decimal
 
 
-class StockLedger(Base):
+class StockLedger(TimestampMixin, Base):
     __tablename__ = "stock_ledger"
     
     ledger_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    raw_material_id = Column(String(50), ForeignKey("raw_material_master.id"), nullable=False, index=True)
-    size_id = Column(String(50), ForeignKey("size_master.id"), nullable=False, index=True)
-    supplier_id = Column(Integer, ForeignKey("suppliers.id"), nullable=True, index=True)
+    raw_material_id = Column(code_key(), ForeignKey("raw_material_master.id"), nullable=False)
+    size_id = Column(code_key(), ForeignKey("size_master.id"), nullable=False, index=True)
+    supplier_id = Column(Integer, ForeignKey("suppliers.id"), nullable=True)
     transaction_date = Column(Date, nullable=False, index=True)
     transaction_type = Column(String(50), nullable=False)
     reference_table = Column(String(100), nullable=True)
     reference_id = Column(Integer, nullable=True)
-    qty_in = Column(Numeric(15, 3), default=Decimal("0.000"), nullable=False)
-    qty_out = Column(Numeric(15, 3), default=Decimal("0.000"), nullable=False)
-    rate = Column(Numeric(15, 2), default=Decimal("0.00"), nullable=False)
+    qty_in = Column(Numeric(15, 3), default=Decimal("0.000"), server_default=text("0"), nullable=False)
+    qty_out = Column(Numeric(15, 3), default=Decimal("0.000"), server_default=text("0"), nullable=False)
+    rate = Column(Numeric(15, 2), default=Decimal("0.00"), server_default=text("0"), nullable=False)
     created_by = Column(String(100), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     
     # Relationships
     raw_material = relationship("RawMaterialMaster")
     size = relationship("SizeMaster")
     supplier = relationship("Supplier")
+
+    # Quantities in integer thousandths and rate in paise, for arithmetic-heavy paths
+    qty_in_units = scaled_int_property('qty_in', 1000)
+    qty_out_units = scaled_int_property('qty_out', 1000)
+    rate_minor = scaled_int_property('rate', 100)
+
+    __table_args__ = (
+        # Stock movements / stock on hand: raw_material_id = ? AND size_id = ? over a date range;
+        # the quantities ride along so the summary sums are index-only scans on PostgreSQL
+        Index('ix_stock_ledger_rm_size_date', 'raw_material_id', 'size_id', 'transaction_date',
+              postgresql_include=['qty_in', 'qty_out', 'rate']),
+        # Supplier-wise movements in date order
+        Index('ix_stock_ledger_supplier_date', 'supplier_id', 'transaction_date'),
+    )
     
     @property
     def amount(self):
         """Calculate the amount: (qty_in - qty_out) * rate"""
-        net_qty = (self.qty_in or Decimal("0.00")) - (self.qty_out or Decimal("0.00"))
-        return net_qty * (self.rate or Decimal("0.00"))
+        # NOT NULL with defaults, so no None fallbacks once the row is flushed
+        return (self.qty_in - self.qty_out) * self.rate
     
     @property
     def net_quantity(self):
         """Calculate net quantity: qty_in - qty_out"""
-        return (self.qty_in or Decimal("0.00")) - (self.qty_out or Decimal("0.00"))
+        return self.qty_in - self.qty_out
     
     def __repr__(self):
-        return f"<StockLedger(ledger_id={self.ledger_id}, raw_material_id='{self.raw_material_id}', qty_in={self.qty_in}, qty_out={self.qty_out})>"
+        d = self.__dict__
+        return f"<StockLedger(ledger_id={d.get('ledger_id')}, raw_material_id='{d.get('raw_material_id')}', qty_in={d.get('qty_in')}, qty_out={d.get('qty_out')})>"
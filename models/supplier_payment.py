@@ -1,18 +1,25 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Numeric, ForeignKey, Date, Enum as SQLEnum
+from sqlalchemy import Column, Computed, Integer, String, Text, Boolean, DateTime, Numeric, ForeignKey, Date, CheckConstraint, Index, event, select, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from decimal import Decimal
 from database import Base
+from models.columns import scaled_int_property
+from models.mixins import AuditMixin, TimestampMixin
 import enum
 
+# Shared zero for empty sums, so no Decimal is parsed per call
+_ZERO = Decimal('0.00')
 
-class PaymentStatus(enum.Enum):
+
+class PaymentStatus(str, enum.Enum):
     DRAFT = "Draft"
     POSTED = "Posted"
     CANCELLED = "Cancelled"
 
 
-class PaymentMode(enum.Enum):
+class PaymentMode(str, enum.Enum):
     CASH = "Cash"
     BANK_TRANSFER = "Bank Transfer"
     CHEQUE = "Cheque"
@@ -24,13 +31,13 @@ class PaymentMode(enum.Enum):
     CREDIT_CARD = "Credit Card"
 
 
-class PaymentType(enum.Enum):
+class PaymentType(str, enum.Enum):
     ADVANCE = "Advance"  # Payment before purchase
     AGAINST_BILL = "Against Bill"  # Payment against specific purchase
     ON_ACCOUNT = "On Account"  # General payment to supplier
 
 
-class SupplierPayment(Base):
+class SupplierPayment(AuditMixin, Base):
     """
     Supplier Payment Model - Payments made to suppliers
     Automatically creates ledger transactions and links with purchase bills
@@ -46,16 +53,16 @@ class SupplierPayment(Base):
     supplier_id = Column(Integer, ForeignKey("suppliers.id"), nullable=False, index=True)
     
     # Payment Details
-    payment_type = Column(SQLEnum(PaymentType), nullable=False, default=PaymentType.AGAINST_BILL)
-    payment_mode = Column(SQLEnum(PaymentMode), nullable=False)
-    status = Column(SQLEnum(PaymentStatus), nullable=False, default=PaymentStatus.DRAFT)
+    payment_type = Column(String(20), nullable=False, default=PaymentType.AGAINST_BILL.value)
+    payment_mode = Column(String(20), nullable=False)  # PaymentMode value
+    status = Column(String(20), nullable=False, default=PaymentStatus.DRAFT.value)
     
     # Amount Details
     gross_amount = Column(Numeric(15, 2), default=0.00, nullable=False)  # Total bills amount
     discount_amount = Column(Numeric(15, 2), default=0.00, nullable=False)  # Discount given
     tds_amount = Column(Numeric(15, 2), default=0.00, nullable=False)  # Tax deducted at source
     other_deductions = Column(Numeric(15, 2), default=0.00, nullable=False)  # Other deductions
-    net_amount = Column(Numeric(15, 2), default=0.00, nullable=False)  # Actual payment amount
+    net_amount = Column(Numeric(15, 2), Computed("gross_amount - discount_amount - tds_amount - other_deductions", persisted=True))  # Actual payment amount, generated by the database
     
     # Payment Mode Specific Details
     bank_account_id = Column(String(50), ForeignKey("accounts_master.account_code"), nullable=True)  # Our bank account
@@ -83,12 +90,8 @@ class SupplierPayment(Base):
     reconciled_by = Column(String(50), nullable=True)
     
     # Audit Fields
-    created_by = Column(String(50), nullable=False)
-    updated_by = Column(String(50), nullable=True)
     posted_by = Column(String(50), nullable=True)
     posted_at = Column(DateTime, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     
     # Relationships
     supplier = relationship("Supplier")
@@ -96,19 +99,38 @@ class SupplierPayment(Base):
     bills = relationship("SupplierPaymentBill", back_populates="payment", cascade="all, delete-orphan")
     ledger_batch = relationship("TransactionBatch")
     
+    # Amounts in integer minor units (paise), for arithmetic-heavy paths
+    gross_amount_minor = scaled_int_property('gross_amount', 100)
+    discount_amount_minor = scaled_int_property('discount_amount', 100)
+    tds_amount_minor = scaled_int_property('tds_amount', 100)
+    other_deductions_minor = scaled_int_property('other_deductions', 100)
+    net_amount_minor = scaled_int_property('net_amount', 100)
+
+    __table_args__ = (
+        # Enum columns are stored as plain strings restricted to the enum values
+        CheckConstraint(payment_type.in_([e.value for e in PaymentType]), name='ck_supplier_payments_payment_type'),
+        CheckConstraint(payment_mode.in_([e.value for e in PaymentMode]), name='ck_supplier_payments_payment_mode'),
+        CheckConstraint(status.in_([e.value for e in PaymentStatus]), name='ck_supplier_payments_status'),
+    )
+    
     @property
     def calculated_net_amount(self):
-        """Calculate net amount: gross - discount - tds - other_deductions"""
-        gross = self.gross_amount or Decimal('0.00')
-        discount = self.discount_amount or Decimal('0.00')
-        tds = self.tds_amount or Decimal('0.00')
-        other = self.other_deductions or Decimal('0.00')
-        return gross - discount - tds - other
+        """Net amount (gross - discount - tds - other_deductions); kept for the response schema"""
+        return self.net_amount
     
-    @property
+    @hybrid_property
     def total_bill_amount(self):
         """Calculate total amount from linked bills"""
-        return sum(bill.paid_amount for bill in self.bills) if self.bills else Decimal('0.00')
+        return sum(bill.paid_amount for bill in self.bills) if self.bills else _ZERO
+
+    @total_bill_amount.expression
+    def total_bill_amount(cls):
+        return (
+            select(func.coalesce(func.sum(SupplierPaymentBill.paid_amount), 0))
+            .where(SupplierPaymentBill.payment_id == cls.id)
+            .correlate(cls)
+            .scalar_subquery()
+        )
     
     @property
     def payment_method_display(self):
@@ -117,10 +139,11 @@ class SupplierPayment(Base):
         return f"{self.payment_mode} Payment"
     
     def __repr__(self):
-        return f"<SupplierPayment(id={self.id}, payment_number='{self.payment_number}', status='{self.status}')>"
+        d = self.__dict__
+        return f"<SupplierPayment(id={d.get('id')}, payment_number='{d.get('payment_number')}', status='{d.get('status')}')>"
 
 
-class SupplierPaymentBill(Base):
+class SupplierPaymentBill(TimestampMixin, Base):
     """
     Supplier Payment Bill Model - Links payments to specific purchase bills
     Tracks partial payments and outstanding amounts
@@ -142,6 +165,7 @@ class SupplierPaymentBill(Base):
     outstanding_amount = Column(Numeric(15, 2), nullable=False)  # Outstanding before this payment
     paid_amount = Column(Numeric(15, 2), nullable=False)  # Amount paid in this transaction
     balance_amount = Column(Numeric(15, 2), nullable=False)  # Remaining balance after payment
+    is_fully_paid = Column(Boolean, Computed("balance_amount <= 0", persisted=True))  # Generated by the database
     
     # Discount and Adjustments
     discount_allowed = Column(Numeric(15, 2), default=0.00, nullable=False)
@@ -150,18 +174,23 @@ class SupplierPaymentBill(Base):
     # Additional Details
     remarks = Column(Text, nullable=True)
     
-    # Audit Fields
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
-    
     # Relationships
     payment = relationship("SupplierPayment", back_populates="bills")
     purchase = relationship("Purchase")
     
-    @property
-    def is_fully_paid(self):
-        """Check if bill is fully paid"""
-        return self.balance_amount <= Decimal('0.00')
+    # Amounts in integer minor units (paise), for arithmetic-heavy paths
+    bill_amount_minor = scaled_int_property('bill_amount', 100)
+    previous_payments_minor = scaled_int_property('previous_payments', 100)
+    outstanding_amount_minor = scaled_int_property('outstanding_amount', 100)
+    paid_amount_minor = scaled_int_property('paid_amount', 100)
+    balance_amount_minor = scaled_int_property('balance_amount', 100)
+    discount_allowed_minor = scaled_int_property('discount_allowed', 100)
+    adjustment_amount_minor = scaled_int_property('adjustment_amount', 100)
+
+    __table_args__ = (
+        # Outstanding-bill reports only touch the unpaid rows
+        Index('ix_supplier_payment_bills_unpaid', 'payment_id', postgresql_where=text('NOT is_fully_paid')),
+    )
     
     @property
     def payment_percentage(self):
@@ -170,19 +199,23 @@ class SupplierPaymentBill(Base):
         return 0.00  # Will be calculated in the API layer
     
     def __repr__(self):
-        return f"<SupplierPaymentBill(id={self.id}, payment_id={self.payment_id}, purchase_id={self.purchase_id})>"
+        d = self.__dict__
+        return f"<SupplierPaymentBill(id={d.get('id')}, payment_id={d.get('payment_id')}, purchase_id={d.get('purchase_id')})>"
 
 
 class SupplierLedger(Base):
     """
     Supplier Ledger Model - Running balance for each supplier
     Tracks all transactions (purchases, payments, returns, adjustments)
+    Insert rows through the ORM session: supplier_balances and running_balance
+    are kept by a before_insert listener, which Core insert() and
+    bulk_insert_mappings() bypass.
     """
     __tablename__ = "supplier_ledger"
     
     # Primary Fields
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    supplier_id = Column(Integer, ForeignKey("suppliers.id"), nullable=False, index=True)
+    supplier_id = Column(Integer, ForeignKey("suppliers.id"), nullable=False)
     
     # Transaction Details
     transaction_date = Column(Date, nullable=False, index=True)
@@ -209,6 +242,16 @@ class SupplierLedger(Base):
     
     # Relationships
     supplier = relationship("Supplier")
+
+    # Amounts in integer minor units (paise), for arithmetic-heavy paths
+    debit_amount_minor = scaled_int_property('debit_amount', 100)
+    credit_amount_minor = scaled_int_property('credit_amount', 100)
+    running_balance_minor = scaled_int_property('running_balance', 100)
+
+    __table_args__ = (
+        # Supplier statements: supplier_id = ? over a date range, in date order
+        Index('ix_supplier_ledger_supplier_date', 'supplier_id', 'transaction_date'),
+    )
     
     @property
     def balance_type(self):
@@ -217,7 +260,57 @@ class SupplierLedger(Base):
         return "Payable"  # Default, will be calculated in API layer
     
     def __repr__(self):
-        return f"<SupplierLedger(id={self.id}, supplier_id={self.supplier_id}, balance={self.running_balance})>"
+        d = self.__dict__
+        return f"<SupplierLedger(id={d.get('id')}, supplier_id={d.get('supplier_id')}, balance={d.get('running_balance')})>"
+
+
+class SupplierBalance(Base):
+    """
+    Supplier Balance Model - Current balance per supplier
+    Maintained on every SupplierLedger insert, so balance lookups read one row
+    """
+    __tablename__ = "supplier_balances"
+    
+    supplier_id = Column(Integer, ForeignKey("suppliers.id"), primary_key=True)
+    balance = Column(Numeric(15, 2), default=0.00, nullable=False)  # Credits - debits
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    
+    def __repr__(self):
+        d = self.__dict__
+        return f"<SupplierBalance(supplier_id={d.get('supplier_id')}, balance={d.get('balance')})>"
+
+
+@event.listens_for(SupplierLedger, 'before_insert')
+def _post_to_supplier_balance(mapper, connection, target):
+    """Move the supplier's stored balance by this entry and stamp it as running_balance.
+
+    On PostgreSQL a single upsert creates the supplier's first balance row or
+    locks and updates the existing one, so concurrent entries for one supplier
+    get consecutive running balances and never race on the first insert.
+    Other backends (local sqlite) update, then insert when no row matched.
+    """
+    delta = (target.credit_amount or 0) - (target.debit_amount or 0)
+    balances = SupplierBalance.__table__
+    if connection.dialect.name == 'postgresql':
+        stmt = pg_insert(balances).values(supplier_id=target.supplier_id, balance=delta)
+        target.running_balance = connection.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[balances.c.supplier_id],
+                set_={'balance': balances.c.balance + stmt.excluded.balance, 'updated_at': func.now()},
+            )
+            .returning(balances.c.balance)
+        ).scalar_one()
+        return
+    balance = connection.execute(
+        balances.update()
+        .where(balances.c.supplier_id == target.supplier_id)
+        .values(balance=balances.c.balance + delta, updated_at=func.now())
+        .returning(balances.c.balance)
+    ).scalar()
+    if balance is None:
+        connection.execute(balances.insert().values(supplier_id=target.supplier_id, balance=delta))
+        balance = delta
+    target.running_balance = balance
 
 
 class TDSEntry(Base):
@@ -260,5 +353,10 @@ class TDSEntry(Base):
     payment = relationship("SupplierPayment")
     supplier = relationship("Supplier")
     
+    # Amounts in integer minor units (paise), for arithmetic-heavy paths
+    gross_amount_minor = scaled_int_property('gross_amount', 100)
+    tds_amount_minor = scaled_int_property('tds_amount', 100)
+    
     def __repr__(self):
-        return f"<TDSEntry(id={self.id}, section='{self.tds_section}', amount={self.tds_amount})>"
+        d = self.__dict__
+        return f"<TDSEntry(id={d.get('id')}, section='{d.get('tds_section')}', amount={d.get('tds_amount')})>"
@@ -1,21 +1,21 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Text, CheckConstraint
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
 from models.user import Base
+from models.mixins import TimestampMixin
 import enum
 
 
-class SupplierType(enum.Enum):
+class SupplierType(str, enum.Enum):
     REGISTERED = "Registered"
     UNREGISTERED = "Unregistered"
 
 
-class Supplier(Base):
+class Supplier(TimestampMixin, Base):
     __tablename__ = "suppliers"
 
     id = Column(Integer, primary_key=True, index=True)
     supplier_name = Column(String(100), nullable=False, index=True)
-    supplier_type = Column(SQLEnum(SupplierType), nullable=False, default=SupplierType.UNREGISTERED)
+    supplier_type = Column(String(20), nullable=False, default=SupplierType.UNREGISTERED.value)
     
     # GST Details (mandatory if registered)
     gst_number = Column(String(15), nullable=True, unique=True, index=True)
@@ -39,15 +39,19 @@ class Supplier(Base):
     
     # Status and Timestamps
     status = Column(String(20), default="Active", nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     # Relationships
     state = relationship("State", back_populates="suppliers")
     agent = relationship("Agent", back_populates="suppliers")
     purchase_orders = relationship("PurchaseOrder", back_populates="supplier")
     purchases = relationship("Purchase", back_populates="supplier")
+    purchase_returns = relationship("PurchaseReturn", back_populates="supplier")
     # stock_ledger_entries = relationship("StockLedger", back_populates="supplier")  # Temporarily disabled
 
+    __table_args__ = (
+        # Enum column stored as a plain string restricted to the enum values
+        CheckConstraint(supplier_type.in_([e.value for e in SupplierType]), name='ck_suppliers_supplier_type'),
+    )
+
     def __repr__(self):
         return f"<Supplier(id={self.id}, name='{self.supplier_name}', type='{self.supplier_type}')>"
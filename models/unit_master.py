@@ -2,11 +2,13 @@ from sqlalchemy import Column, String, Text, Boolean, DateTime
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database import Base
+from models.columns import code_key
+from models.master_cache import CachedLookupMixin
 
-class UnitMaster(Base):
+class UnitMaster(CachedLookupMixin, Base):
     __tablename__ = "unit_master"
     
-    id = Column(String(50), primary_key=True, index=True)
+    id = Column(code_key(), primary_key=True)
     unit_name = Column(String(100), nullable=False, unique=True)
     unit_code = Column(String(20), nullable=False, unique=True)
     description = Column(Text)
@@ -1,8 +1,7 @@
-from sqlalchemy import Column, Integer, String, Enum, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Enum, DateTime, Boolean, Index
 from sqlalchemy.sql import func
-from database import Base, engine
+from database import Base
 import enum
-from datetime import datetime
 
 class UserRole(enum.Enum):
     SUPERADMIN = "superadmin"
@@ -21,9 +20,10 @@ class User(Base):
     username = Column(String(50), unique=True, index=True, nullable=False)
     password = Column(String(255), nullable=False)  # Will store hashed password
     role = Column(Enum(UserRole), nullable=False, default=UserRole.USER)
-    status = Column(Enum(UserStatus), nullable=False, default=UserStatus.ACTIVE)
+    status = Column(Enum(UserStatus), nullable=False, default=UserStatus.ACTIVE, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+    __table_args__ = (
+        Index('ix_users_username_status', 'username', 'status'),
+    )
@@ -0,0 +1,52 @@
+"""
+JSON response class backed by orjson
+"""
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Iterable, Mapping, Optional, Type
+
+import orjson
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+
+def _orjson_default(obj: Any) -> Any:
+    """Serialize types orjson does not handle natively."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, Enum):
+        return obj.value
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse that renders with orjson straight to bytes."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_orjson_default,
+            option=orjson.OPT_NON_STR_KEYS,
+        )
+
+
+def stream_json_list(
+    batches: Iterable[Iterable[Any]],
+    schema: Type[BaseModel],
+    headers: Optional[Mapping[str, str]] = None,
+) -> StreamingResponse:
+    """Stream rows as a JSON array, validating and encoding one batch at a time.
+
+    batches is usually result.partitions() of a yield_per query, so only one
+    batch of rows is held in memory. Rows render as response_model would.
+    """
+    def body():
+        opener = b"["
+        for batch in batches:
+            chunk = b",".join(schema.model_validate(row).model_dump_json().encode() for row in batch)
+            if chunk:
+                yield opener + chunk
+                opener = b","
+        yield b"[]" if opener == b"[" else b"]"
+
+    return StreamingResponse(body(), media_type="application/json", headers=headers)
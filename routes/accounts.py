@@ -1,104 +1,166 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, exists, func, select
+from sqlalchemy.exc import IntegrityError
 from typing import List
+from database import SessionLocal
 from dependencies import get_db, get_current_user
 from models.accounts import AccountsMaster
-from schemas.accounts import AccountsMasterCreate, AccountsMasterUpdate, AccountsMasterResponse
+from schemas.accounts import AccountType, AccountsMasterCreate, AccountsMasterUpdate, AccountsMasterResponse
 from models.user import User
+from responses import stream_json_list
 
 router = APIRouter()
 
+# Rows fetched per server-side cursor batch by the streamed list endpoints
+LIST_BATCH_SIZE = 500
+
+# Lookup statements built once at import; each call only binds parameters,
+# so every request reuses the same compiled-cache entry
+_ALL_PAGED = (
+    select(AccountsMaster)
+    .offset(bindparam("skip"))
+    .limit(bindparam("limit"))
+    .execution_options(yield_per=LIST_BATCH_SIZE)
+)
+_BY_TYPE_ACTIVE = select(AccountsMaster).where(
+    AccountsMaster.account_type == bindparam("account_type"),
+    AccountsMaster.is_active == True
+).execution_options(yield_per=LIST_BATCH_SIZE)
+_ACTIVE_ALL = select(AccountsMaster).where(
+    AccountsMaster.is_active == True
+).execution_options(yield_per=LIST_BATCH_SIZE)
+# Existence check that returns a boolean without loading the row
+_CODE_EXISTS = select(exists().where(AccountsMaster.account_code == bindparam("code")))
+# Both totals in one scan: COUNT(*) plus COUNT(*) FILTER (WHERE is_active)
+_COUNTS = select(
+    func.count().label("total"),
+    func.count().filter(AccountsMaster.is_active == True).label("active")
+).select_from(AccountsMaster)
+
+# Chart-of-accounts lists change rarely; let the client reuse them briefly.
+# private, because the lists sit behind auth and must not land in shared caches.
+LIST_CACHE_CONTROL = "private, max-age=30"
+
+
+def _is_duplicate_code(exc: IntegrityError) -> bool:
+    """True when the failed insert hit the account_code primary key.
+
+    That key is accounts_master's only unique constraint, so any unique
+    violation (SQLSTATE 23505; sqlite's "UNIQUE constraint failed") means
+    the code is taken.
+    """
+    orig = exc.orig
+    sqlstate = getattr(orig, "sqlstate", None) or getattr(orig, "pgcode", None)
+    if sqlstate is not None:
+        return sqlstate == "23505"
+    return "UNIQUE constraint failed" in str(orig)
+
+
+def _stream_accounts(statement, params=None):
+    """Stream a yield_per account query batch by batch as the JSON list response.
+
+    The query runs on a session owned by the response body and closed once
+    the last batch is sent, so the cursor never depends on when request
+    dependencies (get_db) are torn down.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(statement, params)
+    except Exception:
+        db.close()
+        raise
+
+    def batches():
+        try:
+            yield from result.scalars().partitions()
+        finally:
+            db.close()
+
+    return stream_json_list(
+        batches(),
+        AccountsMasterResponse,
+        headers={"Cache-Control": LIST_CACHE_CONTROL},
+    )
+
 
 @router.get("/", response_model=List[AccountsMasterResponse])
-async def get_accounts(
+def get_accounts(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all accounts with pagination"""
-    accounts = db.query(AccountsMaster).offset(skip).limit(limit).all()
-    return accounts
+    return _stream_accounts(_ALL_PAGED, {"skip": skip, "limit": limit})
 
 
 @router.get("/{account_code}", response_model=AccountsMasterResponse)
-async def get_account(
+def get_account(
     account_code: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific account by account code"""
-    account = db.query(AccountsMaster).filter(AccountsMaster.account_code == account_code).first()
+    account = db.get(AccountsMaster, account_code)
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
     return account
 
 
 @router.get("/code/{account_code}", response_model=AccountsMasterResponse)
-async def get_account_by_code(
+def get_account_by_code(
     account_code: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific account by account code"""
-    account = db.query(AccountsMaster).filter(AccountsMaster.account_code == account_code).first()
+    account = db.get(AccountsMaster, account_code)
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
     return account
 
 
 @router.post("/", response_model=AccountsMasterResponse, status_code=status.HTTP_201_CREATED)
-async def create_account(
+def create_account(
     account: AccountsMasterCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new account"""
-    # Check if account code already exists
-    existing_account = db.query(AccountsMaster).filter(AccountsMaster.account_code == account.account_code).first()
-    if existing_account:
-        raise HTTPException(status_code=400, detail="Account code already exists")
-    
-    # Validate account type
-    valid_account_types = ["Asset", "Liability", "Equity", "Income", "Expense"]
-    if account.account_type not in valid_account_types:
-        raise HTTPException(status_code=400, detail=f"Invalid account type. Must be one of: {', '.join(valid_account_types)}")
-    
     # If parent account code is provided, validate it exists
     if account.parent_account_code:
-        parent_account = db.query(AccountsMaster).filter(AccountsMaster.account_code == account.parent_account_code).first()
-        if not parent_account:
+        if not db.execute(_CODE_EXISTS, {"code": account.parent_account_code}).scalar():
             raise HTTPException(status_code=400, detail="Parent account code does not exist")
     
     db_account = AccountsMaster(**account.dict())
     db.add(db_account)
-    db.commit()
+    # account_code is the primary key, so the insert itself rejects duplicates
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        if not _is_duplicate_code(e):
+            raise
+        raise HTTPException(status_code=400, detail="Account code already exists")
     db.refresh(db_account)
     return db_account
 
 
 @router.put("/{account_code}", response_model=AccountsMasterResponse)
-async def update_account(
+def update_account(
     account_code: str,
     account_update: AccountsMasterUpdate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update an existing account"""
-    account = db.query(AccountsMaster).filter(AccountsMaster.account_code == account_code).first()
+    account = db.get(AccountsMaster, account_code)
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
     
-    # Validate account type if provided
-    if account_update.account_type:
-        valid_account_types = ["Asset", "Liability", "Equity", "Income", "Expense"]
-        if account_update.account_type not in valid_account_types:
-            raise HTTPException(status_code=400, detail=f"Invalid account type. Must be one of: {', '.join(valid_account_types)}")
-    
     # If parent account code is provided, validate it exists
     if account_update.parent_account_code:
-        parent_account = db.query(AccountsMaster).filter(AccountsMaster.account_code == account_update.parent_account_code).first()
-        if not parent_account:
+        if not db.execute(_CODE_EXISTS, {"code": account_update.parent_account_code}).scalar():
             raise HTTPException(status_code=400, detail="Parent account code does not exist")
     
     update_data = account_update.dict(exclude_unset=True)
@@ -111,13 +173,13 @@ async def update_account(
 
 
 @router.delete("/{account_code}")
-async def delete_account(
+def delete_account(
     account_code: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete an account (soft delete by setting is_active to False)"""
-    account = db.query(AccountsMaster).filter(AccountsMaster.account_code == account_code).first()
+    account = db.get(AccountsMaster, account_code)
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
     
@@ -128,35 +190,24 @@ async def delete_account(
 
 
 @router.get("/type/{account_type}", response_model=List[AccountsMasterResponse])
-async def get_accounts_by_type(
-    account_type: str,
-    db: Session = Depends(get_db),
+def get_accounts_by_type(
+    account_type: AccountType,
     current_user: User = Depends(get_current_user)
 ):
     """Get all accounts by account type"""
-    valid_account_types = ["Asset", "Liability", "Equity", "Income", "Expense"]
-    if account_type not in valid_account_types:
-        raise HTTPException(status_code=400, detail=f"Invalid account type. Must be one of: {', '.join(valid_account_types)}")
-    
-    accounts = db.query(AccountsMaster).filter(
-        AccountsMaster.account_type == account_type,
-        AccountsMaster.is_active == True
-    ).all()
-    return accounts
+    return _stream_accounts(_BY_TYPE_ACTIVE, {"account_type": account_type})
 
 
 @router.get("/active/all", response_model=List[AccountsMasterResponse])
-async def get_active_accounts(
-    db: Session = Depends(get_db),
+def get_active_accounts(
     current_user: User = Depends(get_current_user)
 ):
     """Get all active accounts"""
-    accounts = db.query(AccountsMaster).filter(AccountsMaster.is_active == True).all()
-    return accounts
+    return _stream_accounts(_ACTIVE_ALL)
 
 
 @router.get("/public/count")
-async def get_accounts_count(db: Session = Depends(get_db)):
+def get_accounts_count(db: Session = Depends(get_db)):
     """Public endpoint to get total accounts count (no auth required)"""
-    count = db.query(AccountsMaster).count()
-    return {"total_accounts": count, "active_accounts": db.query(AccountsMaster).filter(AccountsMaster.is_active == True).count()}
+    row = db.execute(_COUNTS).one()
+    return {"total_accounts": row.total, "active_accounts": row.active}
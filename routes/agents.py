@@ -1,85 +1,78 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, select
 from typing import List, Optional
 from dependencies import get_db, get_current_user
-from models.agents import Agent
+from models.agents import Agent, agent_acc_code_seq
 from models.state import State
 from models.accounts import AccountsMaster
-from schemas.agents import AgentCreate, AgentUpdate, AgentResponse, AgentWithStateResponse
+from schemas.agents import AgentCreate, AgentUpdate, AgentResponse, AgentWithStateResponse, AgentListResponse
 from models.user import User
 from decimal import Decimal
+from auth import TTLCache
 import logging
+import time
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Public agent counts, cached per worker; agent writes through this router
+# drop the entry, other workers catch up within AGENT_COUNT_TTL
+AGENT_COUNT_TTL = 60  # seconds
+_count_cache = TTLCache(1)
 
-def generate_agent_account_code(db: Session, agent_name: str) -> str:
+# Agent list rows: the AgentListResponse fields as plain columns, state
+# fields from the joined row; no Agent/State instances are built
+_LIST_COLUMNS = (
+    Agent.id,
+    Agent.agent_name,
+    Agent.agent_acc_code,
+    Agent.address,
+    Agent.state_id,
+    Agent.city,
+    Agent.phone,
+    Agent.status,
+    Agent.created_at,
+    Agent.updated_at,
+    State.name.label("state_name"),
+    State.code.label("state_code"),
+    State.gst_code.label("gst_code"),
+)
+
+
+def generate_agent_account_code(db: Session) -> str:
     """Generate unique account code for agent automatically"""
     
     # Base code for agents (starting from 2105 series for Agent Commissions Payable)
     base_code = "2105"
     
-    # Get the last agent account code to determine next sequence
-    last_account = db.query(AccountsMaster).filter(
-        AccountsMaster.account_code.like(f"{base_code}%")
-    ).order_by(AccountsMaster.account_code.desc()).first()
-    
-    if last_account:
-        # Extract number part and increment
-        try:
-            account_code = str(last_account.account_code)  # Convert to string first
-            last_number = int(account_code[4:])  # Skip "2105" prefix
-            next_number = last_number + 1
-        except (ValueError, IndexError):
-            next_number = 1
-    else:
-        next_number = 1
+    # nextval() is atomic, so concurrent creates never draw the same number
+    next_number = db.scalar(select(agent_acc_code_seq.next_value()))
     
     # Generate new code with zero padding (3 digits for payable accounts)
-    new_code = f"{base_code}{next_number:03d}"
-    
-    # Ensure uniqueness (in case of race conditions)
-    while db.query(AccountsMaster).filter(AccountsMaster.account_code == new_code).first():
-        next_number += 1
-        new_code = f"{base_code}{next_number:03d}"
-    
-    return new_code
+    return f"{base_code}{next_number:03d}"
 
 
 def create_agent_account(db: Session, agent_name: str, account_code: str):
-    """Create associated payable account for the agent"""
-    try:
-        # Create account in chart of accounts - Agent is a payable account for commissions
-        agent_account = AccountsMaster(
-            account_code=account_code,
-            account_name=f"Agent - {agent_name}",
-            account_type="Liability",
-            parent_account_code="2105",  # Parent: Agent Commissions Payable
-            is_active=True,
-            opening_balance=Decimal('0.00'),
-            current_balance=Decimal('0.00'),
-            description=f"Agent commission payable account for {agent_name}"
-        )
-        
-        db.add(agent_account)
-        db.commit()
-        db.refresh(agent_account)
-        
-        logger.info(f"Created payable account {account_code} for agent {agent_name}")
-        return agent_account
-        
-    except Exception as e:
-        logger.error(f"Failed to create payable account for agent {agent_name}: {e}")
-        db.rollback()
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to create associated payable account: {str(e)}"
-        )
+    """Add the associated payable account for the agent; the caller commits"""
+    # Create account in chart of accounts - Agent is a payable account for commissions
+    agent_account = AccountsMaster(
+        account_code=account_code,
+        account_name=f"Agent - {agent_name}",
+        account_type="Liability",
+        parent_account_code="2105",  # Parent: Agent Commissions Payable
+        is_active=True,
+        opening_balance=Decimal('0.00'),
+        current_balance=Decimal('0.00'),
+        description=f"Agent commission payable account for {agent_name}"
+    )
+    
+    db.add(agent_account)
+    return agent_account
 
 
-@router.get("/", response_model=List[AgentWithStateResponse])
-async def get_agents(
+@router.get("/", response_model=List[AgentListResponse])
+def get_agents(
     skip: int = 0,
     limit: int = 100,
     status_filter: Optional[str] = None,
@@ -87,29 +80,17 @@ async def get_agents(
     current_user: User = Depends(get_current_user)
 ):
     """Get all agents with pagination and optional status filter"""
-    query = db.query(Agent).options(joinedload(Agent.state))
+    query = db.query(*_LIST_COLUMNS).outerjoin(Agent.state)
     
     if status_filter:
         query = query.filter(Agent.status == status_filter)
     
-    agents = query.offset(skip).limit(limit).all()
-    
-    # Format response with state information
-    result = []
-    for agent in agents:
-        agent_data = AgentWithStateResponse.from_orm(agent)
-        # Additional state fields from the relationship
-        if agent.state:
-            agent_data.state_name = agent.state.name
-            agent_data.state_code = agent.state.code
-            agent_data.gst_code = agent.state.gst_code
-        result.append(agent_data)
-    
-    return result
+    rows = query.offset(skip).limit(limit).all()
+    return [AgentListResponse.model_validate(row) for row in rows]
 
 
 @router.get("/{agent_id}", response_model=AgentWithStateResponse)
-async def get_agent(
+def get_agent(
     agent_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -119,17 +100,11 @@ async def get_agent(
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
     
-    agent_data = AgentWithStateResponse.from_orm(agent)
-    if agent.state:
-        agent_data.state_name = agent.state.name
-        agent_data.state_code = agent.state.code
-        agent_data.gst_code = agent.state.gst_code
-    
-    return agent_data
+    return agent
 
 
 @router.get("/code/{agent_acc_code}", response_model=AgentWithStateResponse)
-async def get_agent_by_code(
+def get_agent_by_code(
     agent_acc_code: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -139,17 +114,11 @@ async def get_agent_by_code(
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
     
-    agent_data = AgentWithStateResponse.from_orm(agent)
-    if agent.state:
-        agent_data.state_name = agent.state.name
-        agent_data.state_code = agent.state.code
-        agent_data.gst_code = agent.state.gst_code
-    
-    return agent_data
+    return agent
 
 
 @router.post("/", response_model=AgentResponse, status_code=status.HTTP_201_CREATED)
-async def create_agent(
+def create_agent(
     agent: AgentCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -164,7 +133,7 @@ async def create_agent(
     
     try:
         # Generate unique account code
-        agent_acc_code = generate_agent_account_code(db, agent.agent_name)
+        agent_acc_code = generate_agent_account_code(db)
         
         # Create the agent
         db_agent = Agent(
@@ -173,13 +142,13 @@ async def create_agent(
         )
         
         db.add(db_agent)
-        db.flush()  # Get the agent ID without committing
         
         # Create associated account
         create_agent_account(db, agent.agent_name, agent_acc_code)
         
-        # Commit both agent and account
+        # Agent and account go in with a single flush and commit
         db.commit()
+        _count_cache.clear()
         db.refresh(db_agent)
         
         logger.info(f"Successfully created agent {agent.agent_name} with account {agent_acc_code}")
@@ -197,7 +166,7 @@ async def create_agent(
 
 
 @router.put("/{agent_id}", response_model=AgentResponse)
-async def update_agent(
+def update_agent(
     agent_id: int,
     agent_update: AgentUpdate,
     db: Session = Depends(get_db),
@@ -233,6 +202,7 @@ async def update_agent(
             setattr(agent, field, value)
         
         db.commit()
+        _count_cache.clear()
         db.refresh(agent)
         
         logger.info(f"Successfully updated agent {agent.agent_name}")
@@ -248,7 +218,7 @@ async def update_agent(
 
 
 @router.delete("/{agent_id}")
-async def delete_agent(
+def delete_agent(
     agent_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -271,6 +241,7 @@ async def delete_agent(
             setattr(associated_account, 'is_active', False)
         
         db.commit()
+        _count_cache.clear()
         
         logger.info(f"Successfully deactivated agent {agent.agent_name} and associated account")
         return {"message": f"Agent {agent.agent_name} deactivated successfully"}
@@ -284,8 +255,8 @@ async def delete_agent(
         )
 
 
-@router.get("/status/{status}", response_model=List[AgentWithStateResponse])
-async def get_agents_by_status(
+@router.get("/status/{status}", response_model=List[AgentListResponse])
+def get_agents_by_status(
     status: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -298,22 +269,12 @@ async def get_agents_by_status(
             detail=f"Invalid status. Must be one of: {', '.join(allowed_statuses)}"
         )
     
-    agents = db.query(Agent).options(joinedload(Agent.state)).filter(Agent.status == status).all()
-    
-    result = []
-    for agent in agents:
-        agent_data = AgentWithStateResponse.from_orm(agent)
-        if agent.state:
-            agent_data.state_name = agent.state.name
-            agent_data.state_code = agent.state.code
-            agent_data.gst_code = agent.state.gst_code
-        result.append(agent_data)
-    
-    return result
+    rows = db.query(*_LIST_COLUMNS).outerjoin(Agent.state).filter(Agent.status == status).all()
+    return [AgentListResponse.model_validate(row) for row in rows]
 
 
-@router.get("/state/{state_id}", response_model=List[AgentWithStateResponse])
-async def get_agents_by_state(
+@router.get("/state/{state_id}", response_model=List[AgentListResponse])
+def get_agents_by_state(
     state_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -324,33 +285,29 @@ async def get_agents_by_state(
     if not state:
         raise HTTPException(status_code=404, detail="State not found")
     
-    agents = db.query(Agent).options(joinedload(Agent.state)).filter(Agent.state_id == state_id).all()
-    
-    result = []
-    for agent in agents:
-        agent_data = AgentWithStateResponse.from_orm(agent)
-        agent_data.state_name = agent.state.name
-        agent_data.state_code = agent.state.code
-        agent_data.gst_code = agent.state.gst_code
-        result.append(agent_data)
-    
-    return result
+    rows = db.query(*_LIST_COLUMNS).join(Agent.state).filter(Agent.state_id == state_id).all()
+    return [AgentListResponse.model_validate(row) for row in rows]
 
 
 @router.get("/public/count")
-async def get_agents_count(db: Session = Depends(get_db)):
+def get_agents_count(db: Session = Depends(get_db)):
     """Public endpoint to get agents count (no auth required)"""
-    total_agents = db.query(Agent).count()
-    active_agents = db.query(Agent).filter(Agent.status == "Active").count()
-    inactive_agents = db.query(Agent).filter(Agent.status == "Inactive").count()
-    suspended_agents = db.query(Agent).filter(Agent.status == "Suspended").count()
+    now = time.time()
+    result = _count_cache.get("counts", now)
+    if result is not None:
+        return result
+    
+    # One grouped scan over the status index instead of a COUNT per status
+    counts = dict(db.query(Agent.status, func.count()).group_by(Agent.status).all())
     
-    return {
-        "total_agents": total_agents,
-        "active_agents": active_agents,
-        "inactive_agents": inactive_agents,
-        "suspended_agents": suspended_agents
+    result = {
+        "total_agents": sum(counts.values()),
+        "active_agents": counts.get("Active", 0),
+        "inactive_agents": counts.get("Inactive", 0),
+        "suspended_agents": counts.get("Suspended", 0)
     }
+    _count_cache.set("counts", result, now + AGENT_COUNT_TTL)
+    return result
 
 
 
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, func, or_
+from sqlalchemy.exc import IntegrityError
 from typing import Optional
 import logging
 
@@ -22,7 +23,7 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.post("/", response_model=BillBookSchema)
-async def create_bill_book(
+def create_bill_book(
     bill_book_data: BillBookCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -30,18 +31,7 @@ async def create_bill_book(
 ):
     """Create a new bill book for sales billing."""
     try:
-        # Check if book code already exists
-        existing = db.query(BillBook).filter(
-            BillBook.book_code == bill_book_data.book_code
-        ).first()
-        
-        if existing:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Bill book with code '{bill_book_data.book_code}' already exists"
-            )
-        
-        # Create new bill book
+        # Create new bill book; the UNIQUE book_code rejects duplicates
         db_bill_book = BillBook(**bill_book_data.model_dump())
         db.add(db_bill_book)
         db.commit()
@@ -50,6 +40,12 @@ async def create_bill_book(
         logger.info(f"Created bill book: {db_bill_book.book_name}")
         return db_bill_book
         
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Bill book with code '{bill_book_data.book_code}' already exists"
+        )
     except Exception as e:
         db.rollback()
         logger.error(f"Error creating bill book: {str(e)}")
@@ -60,7 +56,7 @@ async def create_bill_book(
 
 
 @router.get("/", response_model=BillBookListResponse)
-async def list_bill_books(
+def list_bill_books(
     search: Optional[str] = Query(None, description="Search in book name or code"),
     status: Optional[BillBookStatus] = Query(None, description="Filter by status"),
     tax_type: Optional[TaxType] = Query(None, description="Filter by tax type"),
@@ -71,7 +67,22 @@ async def list_bill_books(
 ):
     """List all bill books with filtering and pagination."""
     try:
-        query = db.query(BillBook)
+        # Plain rows of the list schema's columns, no BillBook instances. Each
+        # row carries the filtered total via COUNT(*) OVER (), so the page and
+        # the total come back from one query
+        query = db.query(
+            BillBook.id,
+            BillBook.book_name,
+            BillBook.book_code,
+            BillBook.prefix,
+            BillBook.tax_type,
+            BillBook.starting_number,
+            BillBook.status,
+            BillBook.last_bill_no,
+            BillBook.created_at,
+            BillBook.updated_at,
+            func.count().over().label("total")
+        )
         
         # Apply filters
         if search:
@@ -89,11 +100,16 @@ async def list_bill_books(
         if tax_type:
             query = query.filter(BillBook.tax_type == tax_type)
         
-        # Get total count
-        total = query.count()
-        
         # Apply pagination
-        bill_books = query.offset((page - 1) * per_page).limit(per_page).all()
+        rows = query.offset((page - 1) * per_page).limit(per_page).all()
+        bill_books = [BillBookSchema.model_validate(row) for row in rows]
+        if rows:
+            total = rows[0].total
+        elif page > 1:
+            # Past the last page there are no rows to carry the total
+            total = query.with_entities(func.count(BillBook.id)).scalar()
+        else:
+            total = 0
         
         return BillBookListResponse(
             bill_books=bill_books,
@@ -111,7 +127,7 @@ async def list_bill_books(
 
 
 @router.get("/{bill_book_id}", response_model=BillBookSchema)
-async def get_bill_book(
+def get_bill_book(
     bill_book_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -137,7 +153,7 @@ async def get_bill_book(
 
 
 @router.put("/{bill_book_id}", response_model=BillBookSchema)
-async def update_bill_book(
+def update_bill_book(
     bill_book_id: int,
     bill_book_data: BillBookUpdate,
     db: Session = Depends(get_db),
@@ -154,18 +170,7 @@ async def update_bill_book(
                 detail="Bill book not found"
             )
         
-        # Check if updating book_code and if it already exists
-        if bill_book_data.book_code and bill_book_data.book_code != db_bill_book.book_code:
-            existing = db.query(BillBook).filter(
-                BillBook.book_code == bill_book_data.book_code
-            ).first()
-            if existing:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Bill book with code '{bill_book_data.book_code}' already exists"
-                )
-        
-        # Update fields
+        # Update fields; a book_code clash is rejected by the UNIQUE constraint
         update_data = bill_book_data.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_bill_book, field, value)
@@ -178,6 +183,12 @@ async def update_bill_book(
         
     except HTTPException:
         raise
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Bill book with code '{bill_book_data.book_code}' already exists"
+        )
     except Exception as e:
         db.rollback()
         logger.error(f"Error updating bill book: {str(e)}")
@@ -188,15 +199,15 @@ async def update_bill_book(
 
 
 @router.patch("/{bill_book_id}/increment", response_model=BillBookSchema)
-async def increment_bill_number(
+def increment_bill_number(
     bill_book_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Increment the last bill number for a bill book."""
     try:
-        # Get existing bill book
-        db_bill_book = db.query(BillBook).filter(BillBook.id == bill_book_id).first()
+        # Lock the row until commit so concurrent increments queue up
+        db_bill_book = db.query(BillBook).filter(BillBook.id == bill_book_id).with_for_update().first()
         if not db_bill_book:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -230,7 +241,7 @@ async def increment_bill_number(
 
 
 @router.get("/{bill_book_id}/next-bill-number")
-async def get_next_bill_number(
+def get_next_bill_number(
     bill_book_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -277,15 +288,15 @@ async def get_next_bill_number(
 
 
 @router.post("/{bill_book_id}/generate-bill-number")
-async def generate_and_reserve_bill_number(
+def generate_and_reserve_bill_number(
     bill_book_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Generate and reserve the next bill number for a bill book (increments the counter)."""
     try:
-        # Get existing bill book
-        db_bill_book = db.query(BillBook).filter(BillBook.id == bill_book_id).first()
+        # Lock the row until commit so two requests can't reserve the same number
+        db_bill_book = db.query(BillBook).filter(BillBook.id == bill_book_id).with_for_update().first()
         if not db_bill_book:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -317,11 +328,7 @@ async def generate_and_reserve_bill_number(
             "bill_number": next_number,
             "full_bill_number": next_bill_number,
             "tax_type": db_bill_book.tax_type,
-            "tax_type_description": {
-                "INCLUDE_TAX": "Tax is included in item rates - will be separated during calculation",
-                "EXCLUDE_TAX": "Tax will be added on top of item rates",
-                "WITHOUT_TAX": "No tax calculations needed"
-            }.get(db_bill_book.tax_type.value, "")
+            "tax_type_description": db_bill_book.tax_type.description
         }
         
     except HTTPException:
@@ -20,6 +20,13 @@ import logging
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/ledger-transactions", tags=["Ledger Transactions"])
 
+# Columns read by the list endpoint. Selecting them as plain rows skips
+# building a tracked ORM instance (state + identity map entry) per row.
+_LIST_COLUMNS = tuple(
+    getattr(LedgerTransaction, name)
+    for name in LedgerTransactionResponse.model_fields
+)
+
 
 # Helper function to generate transaction numbers
 def generate_transaction_number(db: Session, voucher_type: str) -> str:
@@ -125,7 +132,7 @@ async def get_ledger_transactions(
 ):
     """Get ledger transactions with filtering options using JWT Token Authentication."""
     try:
-        query = db.query(LedgerTransaction).filter(LedgerTransaction.is_active == True)
+        query = db.query(*_LIST_COLUMNS).filter(LedgerTransaction.is_active == True)
         
         # Apply filters
         if account_code:
@@ -150,9 +157,9 @@ async def get_ledger_transactions(
             query = query.filter(LedgerTransaction.is_reconciled == is_reconciled)
         
         # Order by transaction date descending
-        transactions = query.order_by(desc(LedgerTransaction.transaction_date)).offset(skip).limit(limit).all()
+        rows = query.order_by(desc(LedgerTransaction.transaction_date)).offset(skip).limit(limit).all()
         
-        return transactions
+        return [LedgerTransactionResponse.model_validate(row) for row in rows]
         
     except Exception as e:
         logger.error(f"Error fetching ledger transactions: {str(e)}")
@@ -285,7 +292,7 @@ async def delete_ledger_transaction(
 async def create_bulk_transactions(
     bulk_transaction: BulkTransactionCreate,
     db: Session = Depends(get_db),
-    current_user: str = Depends(get_current_user)
+    current_user = Depends(get_current_user)
 ):
     """Create multiple transactions as a batch with double-entry validation using JWT Token Authentication."""
     try:
@@ -305,23 +312,33 @@ async def create_bulk_transactions(
             total_credit=total_credit,
             is_balanced=(total_debit == total_credit),
             is_posted=True,
-            created_by=current_user
+            created_by=current_user.username
         )
         
         db.add(db_batch)
         db.flush()  # Get the batch ID
         
-        # Create individual transactions
+        # Number transactions per voucher type in memory: rows of this batch
+        # are not in the table yet, so generate_transaction_number only
+        # supplies the first number for each type
+        next_numbers = {}
+        rows = []
         for transaction_data in bulk_transaction.transactions:
-            # Generate transaction number
-            transaction_number = generate_transaction_number(db, transaction_data.voucher_type.value)
+            voucher_type = transaction_data.voucher_type.value
+            if voucher_type not in next_numbers:
+                first_number = generate_transaction_number(db, voucher_type)
+                next_numbers[voucher_type] = (first_number[:-4], int(first_number[-4:]))
+            prefix, number = next_numbers[voucher_type]
+            next_numbers[voucher_type] = (prefix, number + 1)
             
-            db_transaction = LedgerTransaction(
+            rows.append({
                 **transaction_data.dict(),
-                transaction_number=transaction_number,
-                created_by=current_user
-            )
-            db.add(db_transaction)
+                "transaction_number": f"{prefix}{number:04d}",
+                "created_by": current_user.username
+            })
+        
+        # Create individual transactions
+        LedgerTransaction.bulk_post(db, rows)
         
         db.commit()
         db.refresh(db_batch)
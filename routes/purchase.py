@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, raiseload
 from sqlalchemy import func, desc, and_, or_
 from database import get_db
 from dependencies import get_current_user
-from models.purchase import Purchase, PurchaseItem
+from models.purchase import Purchase, PurchaseItem, PurchaseType
 from models.suppliers import Supplier
 from models.accounts import AccountsMaster
 from models.raw_material_master import RawMaterialMaster
@@ -134,7 +134,7 @@ async def create_ledger_entries(db: Session, purchase: Purchase, user_id: str):
         transactions.append(purchase_transaction)
         
         # 2. Credit: Supplier Account or Cash/Bank Account
-        if purchase.purchase_type.value == "CASH":
+        if purchase.purchase_type == PurchaseType.CASH:
             # Cash purchase - Credit Cash Account
             payment_account = "CASH001" if purchase.payment_mode == "CASH" else "BANK001"
             credit_transaction = LedgerTransaction(
@@ -179,7 +179,7 @@ async def create_ledger_entries(db: Session, purchase: Purchase, user_id: str):
         transactions.append(credit_transaction)
         
         # Add partial payment entry if applicable
-        if purchase.amount_paid > 0 and purchase.purchase_type.value == "CREDIT":
+        if purchase.amount_paid > 0 and purchase.purchase_type == PurchaseType.CREDIT:
             # Debit Supplier Account (reduce liability)
             payment_debit = LedgerTransaction(
                 transaction_number=f"PV{purchase.purchase_number}003",
@@ -300,9 +300,6 @@ async def create_purchase(
                     detail=f"Material {item_data.material_id} not found"
                 )
             
-            # Calculate accepted quantity
-            accepted_qty = item_data.quantity - item_data.rejected_qty
-            
             item = PurchaseItem(
                 purchase_id=purchase.id,
                 material_id=item_data.material_id,
@@ -312,17 +309,15 @@ async def create_purchase(
                 quantity=item_data.quantity,
                 unit_id=item_data.unit_id,
                 rate=item_data.rate,
-                total_amount=item_data.quantity * item_data.rate,
                 po_item_id=item_data.po_item_id,
                 quality_status=item_data.quality_status.value,
                 rejected_qty=item_data.rejected_qty,
-                accepted_qty=accepted_qty,
                 batch_number=item_data.batch_number,
                 expiry_date=item_data.expiry_date
             )
             
             db.add(item)
-            total_amount += item.total_amount
+            total_amount += item_data.quantity * item_data.rate
         
         # Update purchase totals
         purchase.sub_total = total_amount
@@ -355,11 +350,14 @@ async def get_purchases(
     date_from: Optional[date] = Query(None),
     date_to: Optional[date] = Query(None),
     is_posted: Optional[bool] = Query(None),
+    is_fully_paid: Optional[bool] = Query(None),
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Get purchases with filtering options"""
-    query = db.query(Purchase)
+    # List rows need no relationships; raiseload keeps the items selectin
+    # default from firing and fails loudly on any accidental lazy load
+    query = db.query(Purchase).options(raiseload('*'))
     
     if supplier_id:
         query = query.filter(Purchase.supplier_id == supplier_id)
@@ -373,6 +371,8 @@ async def get_purchases(
         query = query.filter(Purchase.purchase_date <= date_to)
     if is_posted is not None:
         query = query.filter(Purchase.is_ledger_posted == is_posted)
+    if is_fully_paid is not None:
+        query = query.filter(Purchase.is_fully_paid == is_fully_paid)
     
     purchases = query.order_by(desc(Purchase.created_at)).offset(skip).limit(limit).all()
     return purchases
@@ -536,21 +536,18 @@ async def create_purchase_from_po(
             quantity=received_qty,
             unit_id=po_item.unit_id,
             rate=rate,
-            total_amount=received_qty * rate,
             po_item_id=po_item.id,
             quality_status=received_item.get("quality_status", "Accepted"),
-            accepted_qty=received_qty,
             batch_number=received_item.get("batch_number")
         )
         
         db.add(item)
-        total_amount += item.total_amount
+        total_amount += received_qty * rate
         
-        # Update PO item received quantity
+        # Update PO item received quantity; pending_qty is recomputed by the database
         po_item.received_qty += received_qty
-        po_item.pending_qty = po_item.quantity - po_item.received_qty
         
-        if po_item.pending_qty <= 0:
+        if po_item.quantity - po_item.received_qty <= 0:
             po_item.item_status = "Received"
         elif po_item.received_qty > 0:
             po_item.item_status = "Partial"
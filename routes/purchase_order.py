@@ -26,7 +26,7 @@ def build_purchase_order_response(po_entry, db: Session):
     """Helper function to build purchase order response with related data"""
     
     # Load supplier
-    supplier = db.query(Supplier).filter(Supplier.id == po_entry.supplier_id).first()
+    supplier = po_entry.supplier
     supplier_data = {
         "id": supplier.id,
         "supplier_name": supplier.supplier_name,
@@ -39,8 +39,8 @@ def build_purchase_order_response(po_entry, db: Session):
     # Build items with related data
     items_data = []
     for item in po_entry.items:
-        # Load material
-        material = db.query(RawMaterialMaster).filter(RawMaterialMaster.id == item.material_id).first()
+        # Material and unit are eager-loaded with the item
+        material = item.material
         material_data = {
             "id": material.id,
             "material_name": material.material_name,
@@ -48,8 +48,7 @@ def build_purchase_order_response(po_entry, db: Session):
             "description": material.description
         } if material else None
         
-        # Load unit
-        unit = db.query(UnitMaster).filter(UnitMaster.id == item.unit_id).first()
+        unit = item.unit
         unit_data = {
             "id": unit.id,
             "unit_name": unit.unit_name,
@@ -173,9 +172,7 @@ async def create_purchase_order(
             description=item_data.description,
             quantity=item_data.quantity,
             unit_id=item_data.unit_id,
-            rate=item_data.rate,
-            total_amount=item_total,
-            pending_qty=item_data.quantity
+            rate=item_data.rate
         )
         db.add(db_item)
     
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, noload, selectinload
 from sqlalchemy import func, desc, and_, or_
 from database import get_db
 from dependencies import get_current_user
@@ -280,17 +280,23 @@ async def create_purchase_return(
             created_by=return_data.created_by
         )
         
+        # Not flushed yet: items attach to the in-memory collection and the
+        # header is inserted together with them on commit
         db.add(purchase_return)
-        db.flush()
         
-        # Create return items
-        total_amount = Decimal("0.00")
+        # Load the original purchase items with one query
+        purchase_item_ids = {item.purchase_item_id for item in return_data.items}
+        purchase_items = {
+            row.id: row
+            for row in db.query(PurchaseItem.id, PurchaseItem.material_id, PurchaseItem.accepted_qty)
+            .filter(PurchaseItem.id.in_(purchase_item_ids))
+        }
+        
+        # Create return items; line and header totals are filled in on flush
         for item_data in return_data.items:
             # Validate original purchase item exists
-            purchase_item = db.query(PurchaseItem).filter(
-                PurchaseItem.id == item_data.purchase_item_id
-            ).first()
-            if not purchase_item:
+            purchase_item = purchase_items.get(item_data.purchase_item_id)
+            if purchase_item is None:
                 raise HTTPException(
                     status_code=404, 
                     detail=f"Purchase item {item_data.purchase_item_id} not found"
@@ -311,7 +317,7 @@ async def create_purchase_return(
                 )
             
             item = PurchaseReturnItem(
-                return_id=purchase_return.id,
+                purchase_return=purchase_return,
                 purchase_item_id=item_data.purchase_item_id,
                 material_id=item_data.material_id,
                 size_id=item_data.size_id,
@@ -320,7 +326,6 @@ async def create_purchase_return(
                 return_quantity=item_data.return_quantity,
                 unit_id=item_data.unit_id,
                 rate=item_data.rate,
-                total_amount=item_data.return_quantity * item_data.rate,
                 return_reason=item_data.return_reason,
                 condition_on_return=item_data.condition_on_return,
                 batch_number=item_data.batch_number,
@@ -329,16 +334,17 @@ async def create_purchase_return(
             )
             
             db.add(item)
-            total_amount += item.total_amount
-        
-        # Update return totals
-        purchase_return.sub_total = total_amount
-        purchase_return.total_amount = total_amount + purchase_return.tax_amount + purchase_return.transport_charges + purchase_return.other_charges - purchase_return.discount_amount
         
         db.commit()
         
-        # Refresh to get the complete object with items
-        db.refresh(purchase_return)
+        # Reload the complete object with items
+        purchase_return = (
+            db.query(PurchaseReturn)
+            .options(selectinload(PurchaseReturn.items))
+            .populate_existing()
+            .filter(PurchaseReturn.id == purchase_return.id)
+            .first()
+        )
         
         logger.info(f"Purchase return {return_number} created successfully")
         return purchase_return
@@ -368,7 +374,25 @@ async def get_purchase_returns(
     current_user: dict = Depends(get_current_user)
 ):
     """Get purchase returns with filtering options"""
-    query = db.query(PurchaseReturn)
+    # Fetch only the list columns as plain rows: no items, no Text columns,
+    # no PurchaseReturn instances
+    query = db.query(
+        PurchaseReturn.id,
+        PurchaseReturn.return_number,
+        PurchaseReturn.return_date,
+        PurchaseReturn.supplier_id,
+        PurchaseReturn.purchase_id,
+        PurchaseReturn.purchase_number,
+        PurchaseReturn.return_reason,
+        PurchaseReturn.status,
+        PurchaseReturn.total_amount,
+        PurchaseReturn.pending_refund_amount,
+        PurchaseReturn.is_ledger_posted,
+        PurchaseReturn.is_stock_updated,
+        PurchaseReturn.quality_check_done,
+        PurchaseReturn.created_by,
+        PurchaseReturn.created_at
+    )
     
     if supplier_id:
         query = query.filter(PurchaseReturn.supplier_id == supplier_id)
@@ -396,8 +420,8 @@ async def get_purchase_returns(
                 PurchaseReturn.approved_by.isnot(None)
             ))
     
-    returns = query.order_by(desc(PurchaseReturn.created_at)).offset(skip).limit(limit).all()
-    return returns
+    rows = query.order_by(desc(PurchaseReturn.created_at)).offset(skip).limit(limit).all()
+    return [PurchaseReturnListResponse.model_validate(row) for row in rows]
 
 
 @router.get("/{return_id}", response_model=PurchaseReturnResponse)
@@ -407,7 +431,12 @@ async def get_purchase_return(
     current_user: dict = Depends(get_current_user)
 ):
     """Get a specific purchase return by ID"""
-    purchase_return = db.query(PurchaseReturn).filter(PurchaseReturn.id == return_id).first()
+    purchase_return = (
+        db.query(PurchaseReturn)
+        .options(selectinload(PurchaseReturn.items))
+        .filter(PurchaseReturn.id == return_id)
+        .first()
+    )
     if not purchase_return:
         raise HTTPException(status_code=404, detail="Purchase return not found")
     return purchase_return
@@ -421,7 +450,12 @@ async def update_purchase_return(
     current_user: dict = Depends(get_current_user)
 ):
     """Update a purchase return (only if not posted)"""
-    purchase_return = db.query(PurchaseReturn).filter(PurchaseReturn.id == return_id).first()
+    purchase_return = (
+        db.query(PurchaseReturn)
+        .options(selectinload(PurchaseReturn.items))
+        .filter(PurchaseReturn.id == return_id)
+        .first()
+    )
     if not purchase_return:
         raise HTTPException(status_code=404, detail="Purchase return not found")
     
@@ -436,15 +470,7 @@ async def update_purchase_return(
         if hasattr(purchase_return, field):
             setattr(purchase_return, field, value)
     
-    # Recalculate total if charges are updated
-    if any(field in return_data.dict(exclude_unset=True) for field in 
-           ['tax_amount', 'discount_amount', 'transport_charges', 'other_charges']):
-        purchase_return.total_amount = (
-            purchase_return.sub_total + purchase_return.tax_amount + 
-            purchase_return.transport_charges + purchase_return.other_charges - 
-            purchase_return.discount_amount
-        )
-    
+    # total_amount is recalculated on flush when charges change
     db.commit()
     db.refresh(purchase_return)
     return purchase_return
@@ -457,7 +483,13 @@ async def delete_purchase_return(
     current_user: dict = Depends(get_current_user)
 ):
     """Delete a purchase return (only if not posted)"""
-    purchase_return = db.query(PurchaseReturn).filter(PurchaseReturn.id == return_id).first()
+    # Items and approvals are removed by the ON DELETE CASCADE foreign keys
+    purchase_return = (
+        db.query(PurchaseReturn)
+        .options(noload(PurchaseReturn.items))
+        .filter(PurchaseReturn.id == return_id)
+        .first()
+    )
     if not purchase_return:
         raise HTTPException(status_code=404, detail="Purchase return not found")
     
@@ -481,7 +513,12 @@ async def post_purchase_return(
     current_user: dict = Depends(get_current_user)
 ):
     """Post a purchase return to ledger and stock"""
-    purchase_return = db.query(PurchaseReturn).filter(PurchaseReturn.id == return_id).first()
+    purchase_return = (
+        db.query(PurchaseReturn)
+        .options(selectinload(PurchaseReturn.items))
+        .filter(PurchaseReturn.id == return_id)
+        .first()
+    )
     if not purchase_return:
         raise HTTPException(status_code=404, detail="Purchase return not found")
     
@@ -521,7 +558,12 @@ async def approve_purchase_return(
     current_user: dict = Depends(get_current_user)
 ):
     """Approve or reject a purchase return"""
-    purchase_return = db.query(PurchaseReturn).filter(PurchaseReturn.id == return_id).first()
+    purchase_return = (
+        db.query(PurchaseReturn)
+        .options(noload(PurchaseReturn.items))
+        .filter(PurchaseReturn.id == return_id)
+        .first()
+    )
     if not purchase_return:
         raise HTTPException(status_code=404, detail="Purchase return not found")
     
@@ -565,7 +607,7 @@ async def get_return_summary(
     current_user: dict = Depends(get_current_user)
 ):
     """Get purchase return summary report"""
-    query = db.query(PurchaseReturn)
+    query = db.query(PurchaseReturn).options(noload(PurchaseReturn.items))
     
     if date_from:
         query = query.filter(PurchaseReturn.return_date >= date_from)
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, noload, selectinload
 from sqlalchemy import and_, or_, desc, func
 from typing import List, Optional
 from decimal import Decimal
@@ -177,6 +177,14 @@ def create_account_transaction(db: Session, sale: Sale, transaction_type: str, a
         return None
 
 
+def get_sale_with_items(db: Session, sale_id: int) -> Optional[Sale]:
+    """Reload a sale with the items and payments a SaleWithItems response needs."""
+    return db.query(Sale).options(
+        selectinload(Sale.sale_items),
+        selectinload(Sale.sale_payments)
+    ).populate_existing().filter(Sale.id == sale_id).first()
+
+
 # ================================
 # SALE ROUTES
 # ================================
@@ -267,7 +275,7 @@ def create_sale(
         db.commit()
         
         # Reload with relationships
-        db.refresh(db_sale)
+        db_sale = get_sale_with_items(db, db_sale.id)
         logger.info(f"Created sale: {db_sale.sale_number}")
         
         return db_sale
@@ -299,10 +307,14 @@ def list_sales(
 ):
     """List sales with filtering and pagination."""
     try:
+        # The list is built from sale.__dict__, so keep the item/payment
+        # collections out of it rather than selectin-loading them
         query = db.query(Sale).options(
             joinedload(Sale.customer),
             joinedload(Sale.creator),
-            joinedload(Sale.updater)
+            joinedload(Sale.updater),
+            noload(Sale.sale_items),
+            noload(Sale.sale_payments)
         )
         
         # Apply filters
@@ -374,8 +386,8 @@ def get_sale(sale_id: int, db: Session = Depends(get_db)):
     """Get a specific sale with items and payments."""
     sale = db.query(Sale).options(
         joinedload(Sale.customer),
-        joinedload(Sale.sale_items).joinedload(SaleItem.product_variant),
-        joinedload(Sale.sale_payments),
+        selectinload(Sale.sale_items),
+        selectinload(Sale.sale_payments),
         joinedload(Sale.creator),
         joinedload(Sale.updater)
     ).filter(Sale.id == sale_id).first()
@@ -410,9 +422,8 @@ def update_sale(
         for field, value in update_data.items():
             setattr(db_sale, field, value)
         
-        db_sale.updated_at = datetime.utcnow()
         db.commit()
-        db.refresh(db_sale)
+        db_sale = get_sale_with_items(db, db_sale.id)
         
         logger.info(f"Updated sale: {db_sale.sale_number}")
         return db_sale
@@ -452,7 +463,6 @@ def confirm_sale(sale_id: int, db: Session = Depends(get_db)):
         
         # Update sale status
         sale.status = "confirmed"
-        sale.updated_at = datetime.utcnow()
         
         db.commit()
         
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status, BackgroundTasks
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, func, text
+from sqlalchemy.orm import Session, joinedload, noload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import and_, case, or_, func, insert, lambda_stmt, select, text, update
 from typing import Optional, List
 from decimal import Decimal
 import logging
@@ -11,7 +12,7 @@ from models.sales_bills import SalesBill, SalesBillItem, SalesBillPayment, Sales
 from models.bill_book import BillBook
 from models.customers import Customer
 from models.agents import Agent
-from models.product_management import ProductVariant
+from models.product_management import Product, ProductVariant
 from models.user import User
 from schemas.sales_bills import (
     SalesBillCreate,
@@ -166,8 +167,9 @@ async def create_sales_bill(
     """Create a new sales bill with automatic calculations and financial processing"""
     
     try:
-        # Validate bill book and generate bill number
-        bill_book = db.query(BillBook).filter(BillBook.id == sales_bill_data.bill_book_id).first()
+        # Validate bill book and generate bill number; the row stays locked
+        # until the bill commits, so concurrent bills get distinct numbers
+        bill_book = db.query(BillBook).filter(BillBook.id == sales_bill_data.bill_book_id).with_for_update().first()
         if not bill_book:
             raise HTTPException(status_code=404, detail="Bill book not found")
         
@@ -189,14 +191,22 @@ async def create_sales_bill(
             if not agent:
                 raise HTTPException(status_code=404, detail="Agent not found")
         
+        # Validate product variants with one query
+        variant_ids = {item.product_variant_id for item in sales_bill_data.items}
+        variants = {
+            row.id: row
+            for row in db.execute(
+                select(ProductVariant.id, ProductVariant.sku, Product.product_name)
+                .join(Product, ProductVariant.product_id == Product.id)
+                .where(ProductVariant.id.in_(variant_ids))
+            )
+        }
+        
         # Prepare items with calculations
         processed_items = []
         for item_data in sales_bill_data.items:
-            # Validate product variant
-            product_variant = db.query(ProductVariant).filter(
-                ProductVariant.id == item_data.product_variant_id
-            ).first()
-            if not product_variant:
+            product_variant = variants.get(item_data.product_variant_id)
+            if product_variant is None:
                 raise HTTPException(
                     status_code=404, 
                     detail=f"Product variant {item_data.product_variant_id} not found"
@@ -230,16 +240,18 @@ async def create_sales_bill(
         db.add(db_sales_bill)
         db.flush()  # Get the ID
         
-        # Create sales bill items
+        # Create sales bill items in a single multi-row INSERT
+        item_rows = []
         for item_data in processed_items:
-            calculated = item_data['calculated_amounts']
+            # gross_amount is a generated column; the database fills it in
+            calculated = {k: v for k, v in item_data['calculated_amounts'].items() if k != 'gross_amount'}
             product_variant = item_data['product_variant']
             
-            db_item = SalesBillItem(
+            item_rows.append(dict(
                 sales_bill_id=db_sales_bill.id,
                 product_variant_id=item_data['product_variant_id'],
                 sku_code=product_variant.sku,
-                product_name=product_variant.product.product_name,
+                product_name=product_variant.product_name,
                 item_sequence=item_data['item_sequence'],
                 quantity=item_data['quantity'],
                 rate=item_data['rate'],
@@ -252,11 +264,11 @@ async def create_sales_bill(
                 expiry_date=item_data.get('expiry_date'),
                 remarks=item_data.get('remarks'),
                 **calculated
-            )
-            db.add(db_item)
+            ))
+        if item_rows:
+            db.execute(insert(SalesBillItem), item_rows)
         
         db.commit()
-        db.refresh(db_sales_bill)
         
         # Process financial transactions in background
         background_tasks.add_task(
@@ -267,11 +279,12 @@ async def create_sales_bill(
         
         logger.info(f"Created sales bill {bill_number} for customer {customer.customer_name}")
         
-        # Load with relationships for response
+        # Load with relationships for response; populate_existing overwrites the
+        # in-memory amounts with the values as stored (rounded to the column scale)
         sales_bill_with_relations = db.query(SalesBill).options(
-            joinedload(SalesBill.items),
-            joinedload(SalesBill.payments)
-        ).filter(SalesBill.id == db_sales_bill.id).first()
+            selectinload(SalesBill.items),
+            selectinload(SalesBill.payments)
+        ).populate_existing().filter(SalesBill.id == db_sales_bill.id).first()
         
         return sales_bill_with_relations
         
@@ -286,6 +299,43 @@ async def create_sales_bill(
         )
 
 
+def _filter_sales_bill_list(stmt, search, bill_book_id, customer_id, status, payment_status, from_date, to_date):
+    """Append the list endpoint's optional filters to a cached lambda statement.
+
+    Each filter is its own lambda so every combination of filters caches its
+    compiled SQL once; filter values are tracked as bound parameters.
+    """
+    if search:
+        search_filter = f"%{search}%"
+        stmt += lambda s: s.where(
+            or_(
+                SalesBill.bill_number.ilike(search_filter),
+                Customer.customer_name.ilike(search_filter),
+                SalesBill.reference_number.ilike(search_filter)
+            )
+        )
+    
+    if bill_book_id:
+        stmt += lambda s: s.where(SalesBill.bill_book_id == bill_book_id)
+    
+    if customer_id:
+        stmt += lambda s: s.where(SalesBill.customer_id == customer_id)
+    
+    if status:
+        stmt += lambda s: s.where(SalesBill.status == status)
+    
+    if payment_status:
+        stmt += lambda s: s.where(SalesBill.payment_status == payment_status)
+    
+    if from_date:
+        stmt += lambda s: s.where(SalesBill.bill_date >= from_date)
+    
+    if to_date:
+        stmt += lambda s: s.where(SalesBill.bill_date <= to_date)
+    
+    return stmt
+
+
 @router.get("/", response_model=SalesBillListResponse)
 async def list_sales_bills(
     search: Optional[str] = Query(None, description="Search in bill number, customer name"),
@@ -303,77 +353,53 @@ async def list_sales_bills(
     """List sales bills with filtering and pagination"""
     
     try:
-        query = db.query(SalesBill).join(Customer).filter(SalesBill.is_active == True)
-        
-        # Apply filters
-        if search:
-            search_filter = f"%{search}%"
-            query = query.filter(
-                or_(
-                    SalesBill.bill_number.ilike(search_filter),
-                    Customer.customer_name.ilike(search_filter),
-                    SalesBill.reference_number.ilike(search_filter)
-                )
-            )
-        
-        if bill_book_id:
-            query = query.filter(SalesBill.bill_book_id == bill_book_id)
-        
-        if customer_id:
-            query = query.filter(SalesBill.customer_id == customer_id)
-        
-        if status:
-            query = query.filter(SalesBill.status == status)
-        
-        if payment_status:
-            query = query.filter(SalesBill.payment_status == payment_status)
-        
-        if from_date:
-            query = query.filter(SalesBill.bill_date >= from_date)
-        
-        if to_date:
-            query = query.filter(SalesBill.bill_date <= to_date)
-        
-        # Get total count and amounts
-        total = query.count()
-        
-        # Calculate summary amounts
-        amounts_query = query.with_entities(
-            func.sum(SalesBill.net_amount).label('total_amount'),
-            func.sum(SalesBill.paid_amount).label('paid_amount'),
-            func.sum(SalesBill.balance_amount).label('balance_amount')
-        ).first()
+        # Count and amount totals over the whole filtered set in one query
+        totals = db.execute(_filter_sales_bill_list(
+            lambda_stmt(lambda: select(
+                func.count(SalesBill.id).label('total'),
+                func.sum(SalesBill.net_amount).label('total_amount'),
+                func.sum(SalesBill.paid_amount).label('paid_amount'),
+                func.sum(SalesBill.balance_amount).label('balance_amount')
+            ).join(Customer, SalesBill.customer_id == Customer.id).where(SalesBill.is_active == True)),
+            search, bill_book_id, customer_id, status, payment_status, from_date, to_date
+        )).one()
+        total = totals.total
         
         # Apply pagination and get results
-        sales_bills = query.offset((page - 1) * per_page).limit(per_page).all()
+        # Summaries only need these columns; fetch plain rows rather than
+        # full SalesBill instances (Customer is already joined for filtering)
+        stmt = _filter_sales_bill_list(
+            lambda_stmt(lambda: select(
+                SalesBill.id,
+                SalesBill.bill_number,
+                SalesBill.bill_date,
+                Customer.customer_name,
+                SalesBill.total_item_count,
+                SalesBill.total_quantity,
+                SalesBill.net_amount,
+                SalesBill.payment_status,
+                SalesBill.paid_amount,
+                SalesBill.balance_amount,
+                SalesBill.status,
+                SalesBill.created_at
+            ).join(Customer, SalesBill.customer_id == Customer.id).where(SalesBill.is_active == True)),
+            search, bill_book_id, customer_id, status, payment_status, from_date, to_date
+        )
+        offset = (page - 1) * per_page
+        stmt += lambda s: s.offset(offset).limit(per_page)
+        rows = db.execute(stmt).all()
         
         # Convert to summary format
-        summaries = []
-        for bill in sales_bills:
-            summary = SalesBillSummary(
-                id=bill.id,
-                bill_number=bill.bill_number,
-                bill_date=bill.bill_date,
-                customer_name=bill.customer.customer_name,
-                total_item_count=bill.total_item_count,
-                total_quantity=bill.total_quantity,
-                net_amount=bill.net_amount,
-                payment_status=bill.payment_status,
-                paid_amount=bill.paid_amount,
-                balance_amount=bill.balance_amount,
-                status=bill.status,
-                created_at=bill.created_at
-            )
-            summaries.append(summary)
+        summaries = [SalesBillSummary.model_validate(row) for row in rows]
         
         return SalesBillListResponse(
             sales_bills=summaries,
             total=total,
             page=page,
             per_page=per_page,
-            total_amount=amounts_query.total_amount or 0,
-            paid_amount=amounts_query.paid_amount or 0,
-            balance_amount=amounts_query.balance_amount or 0
+            total_amount=totals.total_amount or 0,
+            paid_amount=totals.paid_amount or 0,
+            balance_amount=totals.balance_amount or 0
         )
         
     except Exception as e:
@@ -394,8 +420,8 @@ async def get_sales_bill(
     
     try:
         sales_bill = db.query(SalesBill).options(
-            joinedload(SalesBill.items),
-            joinedload(SalesBill.payments),
+            noload(SalesBill.items),
+            selectinload(SalesBill.payments),
             joinedload(SalesBill.customer),
             joinedload(SalesBill.agent),
             joinedload(SalesBill.bill_book)
@@ -404,6 +430,16 @@ async def get_sales_bill(
         if not sales_bill:
             raise HTTPException(status_code=404, detail="Sales bill not found")
         
+        # Completed bills carry their items inline; only open bills hit sales_bill_items
+        if sales_bill.items_snapshot is not None:
+            response = SalesBillSchema.model_validate(sales_bill)
+            response.items = [SalesBillItemSchema.model_validate(item) for item in sales_bill.items_snapshot]
+            return response
+        
+        items = db.query(SalesBillItem).filter(
+            SalesBillItem.sales_bill_id == sales_bill_id
+        ).order_by(SalesBillItem.item_sequence).all()
+        set_committed_value(sales_bill, "items", items)
         return sales_bill
         
     except HTTPException:
@@ -429,15 +465,36 @@ async def add_payment(
     
     try:
         # Validate sales bill
-        sales_bill = db.query(SalesBill).filter(SalesBill.id == sales_bill_id).first()
+        sales_bill = db.query(SalesBill.id, SalesBill.bill_number, SalesBill.balance_amount).filter(
+            SalesBill.id == sales_bill_id
+        ).first()
         if not sales_bill:
             raise HTTPException(status_code=404, detail="Sales bill not found")
         
         # Validate payment amount
-        if payment_data.payment_amount <= 0:
+        amount = payment_data.payment_amount
+        if amount <= 0:
             raise HTTPException(status_code=400, detail="Payment amount must be positive")
         
-        if payment_data.payment_amount > sales_bill.balance_amount:
+        if amount > sales_bill.balance_amount:
+            raise HTTPException(status_code=400, detail="Payment amount exceeds balance amount")
+        
+        # Update the bill header in place; the balance guard in WHERE keeps
+        # concurrent payments from overpaying between the check above and here
+        result = db.execute(
+            update(SalesBill)
+            .where(SalesBill.id == sales_bill_id, SalesBill.balance_amount >= amount)
+            .values(
+                paid_amount=SalesBill.paid_amount + amount,
+                balance_amount=SalesBill.balance_amount - amount,
+                payment_status=case(
+                    (SalesBill.balance_amount - amount <= 0, SalesBillPaymentStatus.PAID.value),
+                    else_=SalesBillPaymentStatus.PARTIAL.value
+                )
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
             raise HTTPException(status_code=400, detail="Payment amount exceeds balance amount")
         
         # Create payment record
@@ -448,20 +505,10 @@ async def add_payment(
         )
         
         db.add(db_payment)
-        
-        # Update sales bill payment status
-        sales_bill.paid_amount += payment_data.payment_amount
-        sales_bill.balance_amount -= payment_data.payment_amount
-        
-        if sales_bill.balance_amount <= 0:
-            sales_bill.payment_status = SalesBillPaymentStatus.PAID
-        elif sales_bill.paid_amount > 0:
-            sales_bill.payment_status = SalesBillPaymentStatus.PARTIAL
-        
         db.commit()
         db.refresh(db_payment)
         
-        logger.info(f"Added payment of {payment_data.payment_amount} to bill {sales_bill.bill_number}")
+        logger.info(f"Added payment of {amount} to bill {sales_bill.bill_number}")
         
         return db_payment
         
@@ -476,5 +523,54 @@ async def add_payment(
         )
 
 
+@router.put("/{sales_bill_id}/status", response_model=SalesBillSchema)
+async def update_sales_bill_status(
+    sales_bill_id: int,
+    status_data: SalesBillStatusUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Move a sales bill to a new status; completing it freezes the items"""
+    
+    try:
+        sales_bill = db.query(SalesBill).options(
+            selectinload(SalesBill.items),
+            selectinload(SalesBill.payments)
+        ).filter(SalesBill.id == sales_bill_id).first()
+        
+        if not sales_bill:
+            raise HTTPException(status_code=404, detail="Sales bill not found")
+        
+        if sales_bill.status in (SalesBillStatus.COMPLETED.value, SalesBillStatus.CANCELLED.value):
+            raise HTTPException(status_code=400, detail=f"Sales bill is already {sales_bill.status}")
+        
+        sales_bill.status = status_data.status.value
+        sales_bill.updated_by = current_user.id
+        if status_data.remarks:
+            sales_bill.remarks = status_data.remarks
+        
+        if status_data.status == SalesBillStatus.COMPLETED:
+            sales_bill.items_snapshot = [
+                SalesBillItemSchema.model_validate(item).model_dump(mode="json")
+                for item in sorted(sales_bill.items, key=lambda item: item.item_sequence)
+            ]
+        
+        db.commit()
+        
+        logger.info(f"Sales bill {sales_bill.bill_number} moved to {sales_bill.status}")
+        
+        return sales_bill
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error updating sales bill status: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to update sales bill status: {str(e)}"
+        )
+
+
 # Add more endpoints for update, delete, status changes, etc.
 # This is the foundation - you can expand based on your needs
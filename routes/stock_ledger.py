@@ -23,16 +23,16 @@ def build_stock_ledger_response(db_entry, db: Session):
     from models.size_master import SizeMaster
     from models.suppliers import Supplier
     
-    # Load raw material
-    raw_material = db.query(RawMaterialMaster).filter(RawMaterialMaster.id == db_entry.raw_material_id).first()
+    # Load raw material (cached master lookup)
+    raw_material = RawMaterialMaster.get_by_id(db_entry.raw_material_id)
     raw_material_data = {
         "id": raw_material.id,
         "material_name": raw_material.material_name,
         "description": raw_material.description
     } if raw_material else None
     
-    # Load size
-    size = db.query(SizeMaster).filter(SizeMaster.id == db_entry.size_id).first()
+    # Load size (cached master lookup)
+    size = SizeMaster.get_by_id(db_entry.size_id)
     size_data = {
         "id": size.id,
         "size_name": size.size_name,
@@ -125,11 +125,8 @@ async def get_stock_ledger_entries(
 ):
     """Get stock ledger entries with filtering options using JWT Token Authentication."""
     
-    query = db.query(StockLedger).options(
-        joinedload(StockLedger.raw_material),
-        joinedload(StockLedger.size)
-        # joinedload(StockLedger.supplier)  # Temporarily commented due to circular import
-    )
+    # Material and size names come from the master cache in build_stock_ledger_response
+    query = db.query(StockLedger)
     
     # Apply filters
     if raw_material_id:
@@ -162,11 +159,7 @@ async def get_stock_ledger_entry(
 ):
     """Get a specific stock ledger entry by ID using JWT Token Authentication."""
     
-    entry = db.query(StockLedger).options(
-        joinedload(StockLedger.raw_material),
-        joinedload(StockLedger.size)
-        # joinedload(StockLedger.supplier)  # Temporarily commented due to circular import
-    ).filter(StockLedger.ledger_id == ledger_id).first()
+    entry = db.query(StockLedger).filter(StockLedger.ledger_id == ledger_id).first()
     
     if not entry:
         raise HTTPException(
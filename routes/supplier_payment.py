@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import func, desc, insert
 from typing import List, Optional
 from datetime import datetime, date, timedelta
 from decimal import Decimal
@@ -129,21 +130,30 @@ async def create_supplier_payment(
         payment.status = PaymentStatus.DRAFT
         
         db.add(payment)
-        db.flush()
+        db.flush()  # Get the ID
         
-        # Create payment bill entries
-        for bill_data in payment_data.bills:
-            payment_bill = SupplierPaymentBill()
-            payment_bill.payment_id = payment.id
-            payment_bill.purchase_id = bill_data.purchase_id
-            payment_bill.bill_amount = bill_data.bill_amount
-            payment_bill.outstanding_amount = bill_data.outstanding_amount
-            payment_bill.paid_amount = bill_data.paid_amount
-            payment_bill.discount_allowed = bill_data.discount_allowed
-            payment_bill.adjustment_amount = bill_data.adjustment_amount
-            payment_bill.remarks = bill_data.remarks
-            
-            db.add(payment_bill)
+        # Create payment bill entries in a single multi-row INSERT
+        bill_rows = [
+            dict(
+                payment_id=payment.id,
+                purchase_id=bill_data.purchase_id,
+                bill_amount=bill_data.bill_amount,
+                outstanding_amount=bill_data.outstanding_amount,
+                paid_amount=bill_data.paid_amount,
+                discount_allowed=bill_data.discount_allowed,
+                adjustment_amount=bill_data.adjustment_amount,
+                remarks=bill_data.remarks,
+            )
+            for bill_data in payment_data.bills
+        ]
+        bills = []
+        if bill_rows:
+            bills = db.scalars(
+                insert(SupplierPaymentBill).returning(SupplierPaymentBill, sort_by_parameter_order=True),
+                bill_rows
+            ).all()
+        # Attach the inserted rows so the response doesn't lazy-load bills
+        set_committed_value(payment, "bills", bills)
         
         # Create TDS entry if applicable
         if payment_data.tds_amount and payment_data.tds_amount > 0:
@@ -199,7 +209,9 @@ async def get_supplier_payment(
 ):
     """Get supplier payment by ID"""
     
-    payment = db.query(SupplierPayment).filter(SupplierPayment.id == payment_id).first()
+    payment = db.query(SupplierPayment).options(
+        selectinload(SupplierPayment.bills)
+    ).filter(SupplierPayment.id == payment_id).first()
     if not payment:
         raise HTTPException(status_code=404, detail="Payment not found")
     
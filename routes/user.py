@@ -4,10 +4,10 @@ from sqlalchemy.orm import Session
 from typing import List
 from datetime import timedelta
 
-from dependencies import get_db, get_current_active_user, require_admin, require_superadmin
+from dependencies import get_db, get_current_active_user, require_admin, require_superadmin, invalidate_user
 from models.user import User, UserRole, UserStatus
 from schemas.user import UserCreate, UserUpdate, UserResponse, UserLogin, Token
-from auth import verify_password, get_password_hash, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from auth import averify_password, aget_password_hash, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
 
 router = APIRouter()
 
@@ -18,15 +18,15 @@ async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
     # Find user by username
     user = db.query(User).filter(User.username == user_credentials.username).first()
     
-    if not user or not verify_password(user_credentials.password, str(user.password)):
+    if not user or not await averify_password(user_credentials.password, str(user.password)):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Check if user is active - using value comparison to avoid SQLAlchemy issues
-    if user.status.value != UserStatus.ACTIVE.value:
+    # Check if user is active
+    if user.status != UserStatus.ACTIVE:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"User account is not active. Status: {user.status}"
@@ -88,7 +88,7 @@ async def create_user(
     # Create user
     db_user = User(
         username=user.username,
-        password=get_password_hash(user.password),
+        password=await aget_password_hash(user.password),
         role=user.role,
         status=user.status
     )
@@ -125,7 +125,7 @@ async def update_user(
         update_data['username'] = user_update.username
     
     if user_update.password:
-        update_data['password'] = get_password_hash(user_update.password)
+        update_data['password'] = await aget_password_hash(user_update.password)
     
     if user_update.role is not None:
         # Only superadmin can change roles to admin/superadmin
@@ -138,8 +138,10 @@ async def update_user(
     
     # Perform the update
     if update_data:
+        old_username = user.username
         db.query(User).filter(User.id == user_id).update(update_data)
         db.commit()
+        invalidate_user(old_username)
         db.refresh(user)
     
     return user
@@ -159,8 +161,10 @@ async def delete_user(
     if user_id == current_user.id:
         raise HTTPException(status_code=400, detail="Cannot delete your own account")
     
+    username = user.username
     db.delete(user)
     db.commit()
+    invalidate_user(username)
     return {"message": "User deleted successfully"}
 
 
@@ -1,13 +1,16 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Literal, Optional
 from decimal import Decimal
 from datetime import datetime
 
 
+AccountType = Literal["Asset", "Liability", "Equity", "Income", "Expense"]
+
+
 class AccountsMasterBase(BaseModel):
     account_code: str = Field(..., max_length=20, description="Unique account code")
     account_name: str = Field(..., max_length=100, description="Account name")
-    account_type: str = Field(..., max_length=50, description="Account type (Asset, Liability, Equity, Income, Expense)")
+    account_type: AccountType = Field(..., description="Account type (Asset, Liability, Equity, Income, Expense)")
     parent_account_code: Optional[str] = Field(None, max_length=20, description="Parent account code for hierarchical structure")
     is_active: bool = Field(True, description="Whether the account is active")
     opening_balance: Decimal = Field(Decimal('0.00'), description="Opening balance")
@@ -21,7 +24,7 @@ class AccountsMasterCreate(AccountsMasterBase):
 
 class AccountsMasterUpdate(BaseModel):
     account_name: Optional[str] = Field(None, max_length=100)
-    account_type: Optional[str] = Field(None, max_length=50)
+    account_type: Optional[AccountType] = None
     parent_account_code: Optional[str] = Field(None, max_length=20)
     is_active: Optional[bool] = None
     opening_balance: Optional[Decimal] = None
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import AliasPath, BaseModel, Field, computed_field, validator
 from typing import Optional
 from datetime import datetime
 from .state import StateResponse
@@ -67,6 +67,29 @@ class AgentResponse(AgentBase):
 
 
 class AgentWithStateResponse(AgentResponse):
+    # Read straight off the loaded state relationship (None when no state)
+    state_name: Optional[str] = Field(None, validation_alias=AliasPath('state', 'name'))
+    state_code: Optional[str] = Field(None, validation_alias=AliasPath('state', 'code'))
+    gst_code: Optional[str] = Field(None, validation_alias=AliasPath('state', 'gst_code'))
+
+
+class AgentListResponse(AgentBase):
+    """List row validated from flat selected columns; same JSON as AgentWithStateResponse"""
+    id: int
+    agent_acc_code: str
+    created_at: datetime
+    updated_at: datetime
     state_name: Optional[str] = None
     state_code: Optional[str] = None
     gst_code: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+    @computed_field
+    @property
+    def state(self) -> Optional[StateResponse]:
+        # Rebuilt from the joined state columns (state name is NOT NULL, so None means no state)
+        if self.state_name is None:
+            return None
+        return StateResponse(id=self.state_id, name=self.state_name, code=self.state_code, gst_code=self.gst_code)
@@ -83,8 +83,8 @@ class PurchaseReturnItemResponse(PurchaseReturnItemBase):
     created_at: datetime
     updated_at: datetime
     
-    # Calculated fields
-    calculated_total: Decimal
+    # Calculated fields, kept for clients; read from the stored total
+    calculated_total: Decimal = Field(validation_alias="total_amount")
     
     class Config:
         from_attributes = True
@@ -169,9 +169,9 @@ class PurchaseReturnResponse(PurchaseReturnBase):
     created_at: datetime
     updated_at: datetime
     
-    # Calculated fields
-    calculated_sub_total: Decimal
-    calculated_total: Decimal
+    # Calculated fields; the totals are kept for clients and read from the stored columns
+    calculated_sub_total: Decimal = Field(validation_alias="sub_total")
+    calculated_total: Decimal = Field(validation_alias="total_amount")
     pending_refund_amount: Decimal
     is_fully_refunded: bool
     
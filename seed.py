@@ -13,6 +13,14 @@ from models.size_master import SizeMaster  # Import to ensure creation (needed b
 from models.unit_master import UnitMaster  # Import to ensure creation (needed by RawMaterial)
 from models.raw_material_master import RawMaterialMaster  # Import to ensure creation (needed by StockLedger)
 from models.stock_ledger import StockLedger  # Import StockLedger last
+from models.supplier_payment import SupplierBalance, SupplierLedger, SupplierPayment, SupplierPaymentBill
+from models.purchase import PurchaseItem
+from models.purchase_order import PurchaseOrderItem
+from models.purchase_return import PurchaseReturnItem
+from models.sales_bills import SalesBillItem
+from models.ledger_transaction import LedgerTransaction
+from sqlalchemy import case, column, exists, func, inspect, insert, select, text
+from sqlalchemy.schema import CreateColumn
 from auth import get_password_hash
 from decimal import Decimal
 import logging
@@ -248,13 +256,177 @@ def create_default_accounts():
         db.close()
 
 
+# Columns the models declare as GENERATED ALWAYS ... STORED that older databases
+# hold as plain (or no) columns; create_all never alters an existing table.
+_GENERATED_COLUMNS = (
+    (PurchaseItem, 'total_amount'),
+    (PurchaseItem, 'accepted_qty'),
+    (PurchaseOrderItem, 'total_amount'),
+    (PurchaseOrderItem, 'pending_qty'),
+    (PurchaseReturnItem, 'total_amount'),
+    (SalesBillItem, 'gross_amount'),
+    (SupplierPayment, 'net_amount'),
+    (SupplierPaymentBill, 'is_fully_paid'),
+)
+
+_COLUMN_IS_GENERATED = text("""
+    SELECT is_generated FROM information_schema.columns
+    WHERE table_schema = current_schema() AND table_name = :table AND column_name = :column
+""")
+
+
+def convert_generated_columns():
+    """Rebuild plain columns of existing tables as the generated columns the models declare.
+
+    The values derive from other columns, so dropping and re-adding the column
+    loses nothing. Indexes dropped with the old column are recreated. Runs
+    before create_all; a no-op for new databases and once converted.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        tables = set(inspect(conn).get_table_names())
+        converted = set()
+        for model, name in _GENERATED_COLUMNS:
+            table = model.__table__
+            if table.name not in tables:
+                continue  # create_all builds it with the generated column
+            state = conn.execute(_COLUMN_IS_GENERATED, {"table": table.name, "column": name}).scalar()
+            if state == "ALWAYS":
+                continue
+            if state is not None:
+                conn.execute(text(f'ALTER TABLE {table.name} DROP COLUMN {name}'))
+            column_ddl = CreateColumn(table.c[name]).compile(dialect=conn.dialect)
+            conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column_ddl}'))
+            converted.add(table)
+            logger.info(f"Converted {table.name}.{name} to a generated column")
+        for table in converted:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+
+# String columns the models now store as SmallIntCode ids; older databases
+# still hold them as VARCHAR
+_SMALLINT_CODE_COLUMNS = (
+    (LedgerTransaction, 'reference_type'),
+    (LedgerTransaction, 'voucher_type'),
+    (LedgerTransaction, 'party_type'),
+)
+
+_COLUMN_DATA_TYPE = text("""
+    SELECT data_type FROM information_schema.columns
+    WHERE table_schema = current_schema() AND table_name = :table AND column_name = :column
+""")
+
+
+def convert_smallint_code_columns():
+    """Retype VARCHAR code columns of existing tables to SMALLINT ids.
+
+    Each stored code is mapped to its id from the column's SmallIntCode. A
+    column holding codes the model does not know is left as is and logged,
+    so no row loses its value. Runs before create_all; a no-op once converted.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        tables = set(inspect(conn).get_table_names())
+        for model, name in _SMALLINT_CODE_COLUMNS:
+            table = model.__table__
+            if table.name not in tables:
+                continue
+            data_type = conn.execute(_COLUMN_DATA_TYPE, {"table": table.name, "column": name}).scalar()
+            if data_type in (None, "smallint"):
+                continue
+            ids = table.c[name].type._ids
+            unknown = conn.execute(
+                select(column(name)).distinct().select_from(text(table.name))
+                .where(column(name).isnot(None), column(name).notin_(list(ids)))
+            ).scalars().all()
+            if unknown:
+                logger.error(f"Not converting {table.name}.{name}: unknown codes {unknown}")
+                continue
+            to_id = case(ids, value=column(name)).compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+            conn.execute(text(f'ALTER TABLE {table.name} ALTER COLUMN {name} TYPE smallint USING {to_id}'))
+            logger.info(f"Converted {table.name}.{name} to SMALLINT code ids")
+
+
+def backfill_supplier_balances():
+    """Create balance rows for suppliers with ledger entries but no balance yet.
+
+    Needed once for databases whose supplier_ledger predates supplier_balances;
+    a no-op afterwards.
+    """
+    db = SessionLocal()
+    try:
+        missing = (
+            select(SupplierLedger.supplier_id, func.sum(SupplierLedger.credit_amount) - func.sum(SupplierLedger.debit_amount))
+            .where(~exists().where(SupplierBalance.supplier_id == SupplierLedger.supplier_id))
+            .group_by(SupplierLedger.supplier_id)
+        )
+        result = db.execute(insert(SupplierBalance).from_select(['supplier_id', 'balance'], missing))
+        db.commit()
+        if result.rowcount:
+            logger.info(f"Backfilled balances for {result.rowcount} suppliers")
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error backfilling supplier balances: {e}")
+    finally:
+        db.close()
+
+
+# Move agent_acc_code_seq past the highest existing 2105xxx agent account.
+# Never moves it backwards and leaves a fresh sequence alone, so it is safe on every boot.
+_SYNC_AGENT_ACC_CODE_SEQ = text("""
+    SELECT setval('agent_acc_code_seq', s.max_code)
+    FROM (
+        SELECT max(substring(account_code from 5)::int) AS max_code
+        FROM accounts_master
+        WHERE account_code ~ '^2105[0-9]+$'
+    ) s
+    WHERE s.max_code >= (
+        SELECT CASE WHEN is_called THEN last_value + 1 ELSE last_value END
+        FROM agent_acc_code_seq
+    )
+""")
+
+
+def sync_agent_acc_code_seq():
+    """Align the agent account code sequence with accounts created before it existed."""
+    if engine.dialect.name != "postgresql":
+        return
+    db = SessionLocal()
+    try:
+        if db.execute(_SYNC_AGENT_ACC_CODE_SEQ).first() is not None:
+            logger.info("Agent account code sequence advanced past existing codes")
+        db.commit()
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error syncing agent account code sequence: {e}")
+    finally:
+        db.close()
+
+
 def init_database():
     """Initialize database with tables and seed data."""
     try:
+        # Plain columns that the models now declare as generated
+        convert_generated_columns()
+        
+        # VARCHAR code columns that the models now store as SMALLINT ids
+        convert_smallint_code_columns()
+        
         # Create tables
         Base.metadata.create_all(bind=engine)
         logger.info("Database tables created")
         
+        # Balance rows for supplier ledgers written before supplier_balances existed
+        backfill_supplier_balances()
+        
+        # Agent codes already issued before agent_acc_code_seq existed
+        sync_agent_acc_code_seq()
+        
         # Seed Indian states first
         seed_indian_states()
         